@@ -2,9 +2,12 @@ from cloudshell.workflow.orchestration.sandbox import Sandbox
 from cloudshell.workflow.orchestration.setup.default_setup_orchestrator import DefaultSetupWorkflow
 from cloudshell.workflow.orchestration.setup.ixia.setup_orchestrator import IxiaSetupWorkflow
 
+from ixvm_setup_orchestrator import IxVMSetupWorkflow
+
 sandbox = Sandbox()
 
 DefaultSetupWorkflow().register(sandbox)
 IxiaSetupWorkflow().register(sandbox)
+IxVMSetupWorkflow().register(sandbox)
 
 sandbox.execute_setup()
@@ -0,0 +1,234 @@
+import json
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+
+IXVM_CHASSIS_MODEL = "IxVM Virtual Traffic Chassis 2G"
+AUTOLOAD_DEPLOYMENT_ATTRIBUTE = "Autoload"
+DEFAULT_MAX_CONCURRENCY = 10
+MAX_CONCURRENCY_PARAM = "IxVM Max Concurrent Autoloads"
+AUTOLOAD_STATUS_COMMAND = "get_autoload_status"
+AUTOLOAD_STATUS_POLL_INTERVAL = 10
+AUTOLOAD_JOB_ACTIVE_STATUSES = ("queued", "running")
+
+
+class IxVMChassisSetupResult(object):
+    def __init__(self, chassis_name, error=None):
+        """
+
+        :param str chassis_name:
+        :param Exception error:
+        """
+        self.chassis_name = chassis_name
+        self.error = error
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+class IxVMSetupWorkflow(object):
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """Autoload and connect IxVM chassis in the reservation in parallel
+
+        Every chassis goes through its own "Autoload" -> "Connect Child Resources" chain,
+        so connections of the chassis are remapped as soon as its autoload finishes
+        without waiting for the rest of the chassis in the reservation
+
+        :param int max_concurrency: max amount of the chassis processed at the same time
+        """
+        self._max_concurrency = max_concurrency
+        self._output_lock = threading.Lock()
+
+    def register(self, sandbox):
+        """Register the workflow after the connectivity stage
+
+        Chassis are powered on and have their IPs by then. The workflow runs before the configuration stage,
+        so it doesn't autoload the chassis at the same time with the other workflows registered for
+        the configuration, e.g. IxiaSetupWorkflow
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :return:
+        """
+        sandbox.logger.info("Adding IxVM setup orchestration")
+        sandbox.workflow.on_connectivity_ended(self.configure_ixvm_chassis, None)
+
+    def _get_max_concurrency(self, sandbox):
+        """Get max amount of the concurrent chassis setups, can be overridden by the sandbox input
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :rtype: int
+        """
+        max_concurrency = sandbox.get_user_param(MAX_CONCURRENCY_PARAM)
+
+        if max_concurrency:
+            return max(int(max_concurrency), 1)
+
+        return self._max_concurrency
+
+    @staticmethod
+    def _is_autoload_enabled(app):
+        """Whether the App is autoloaded by the default setup during the provisioning stage
+
+        :param cloudshell.workflow.orchestration.app.App app:
+        :rtype: bool
+        """
+        deployment_path = app.app_request.app_resource.DeploymentPaths[0]
+
+        for attribute in deployment_path.DeploymentService.Attributes:
+            attribute_name = attribute.Name.lower()
+            # support both 1st and 2nd Gen deployment attributes
+            if (attribute_name == AUTOLOAD_DEPLOYMENT_ATTRIBUTE.lower() or
+                    attribute_name.endswith(".{}".format(AUTOLOAD_DEPLOYMENT_ATTRIBUTE.lower()))):
+                return attribute.Value.lower() == "true"
+
+        return True
+
+    def _get_chassis_names(self, sandbox):
+        """Get names of the deployed IxVM chassis that weren't autoloaded by the default setup
+
+        Apps with the Autoload deployment attribute enabled are already autoloaded and connected
+        during the provisioning stage, so they aren't discovered the second time
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :rtype: list[str]
+        """
+        chassis_names = []
+
+        for app in sandbox.components.apps.itervalues():
+            if (app.deployed_app is None or app.app_request.app_resource is None or
+                    app.deployed_app.ResourceModelName != IXVM_CHASSIS_MODEL):
+                continue
+
+            if self._is_autoload_enabled(app):
+                sandbox.logger.info("IxVM chassis {} is autoloaded by the default setup".format(
+                    app.deployed_app.Name))
+            else:
+                chassis_names.append(app.deployed_app.Name)
+
+        return sorted(chassis_names)
+
+    def _write_message(self, sandbox, message):
+        """Write message to the reservation output from the worker thread
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :param str message:
+        :return:
+        """
+        with self._output_lock:
+            sandbox.automation_api.WriteMessageToReservationOutput(reservationId=sandbox.id, message=message)
+
+    def _get_autoload_status(self, sandbox, chassis_name):
+        """Get status of the chassis background Autoload job
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :param str chassis_name:
+        :rtype: dict
+        """
+        command_result = sandbox.automation_api.ExecuteCommand(reservationId=sandbox.id,
+                                                               targetName=chassis_name,
+                                                               targetType="Resource",
+                                                               commandName=AUTOLOAD_STATUS_COMMAND,
+                                                               commandInputs=[],
+                                                               printOutput=False)
+        return json.loads(command_result.Output)
+
+    def _autoload_chassis(self, sandbox, chassis_name):
+        """Autoload the chassis, wait for the background Autoload job if it's enabled on the chassis
+
+        With the background Autoload the first command only starts the job, the job is polled
+        with the status command and the second Autoload call applies its result. The first command
+        fails if the driver has no known structure of the chassis to return while the job is running
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :param str chassis_name:
+        """
+        api = sandbox.automation_api
+
+        try:
+            api.AutoLoad(chassis_name)
+        except Exception:
+            if self._get_autoload_status(sandbox, chassis_name)["status"] == "none":
+                raise
+
+        autoload_status = self._get_autoload_status(sandbox, chassis_name)
+
+        if autoload_status["status"] == "none":
+            return
+
+        while autoload_status["status"] in AUTOLOAD_JOB_ACTIVE_STATUSES:
+            sandbox.logger.info("Background Autoload of IxVM chassis {} is {}: {}".format(
+                chassis_name, autoload_status["status"], json.dumps(autoload_status["phases"])))
+            time.sleep(AUTOLOAD_STATUS_POLL_INTERVAL)
+            autoload_status = self._get_autoload_status(sandbox, chassis_name)
+
+        sandbox.logger.info("Background Autoload of IxVM chassis {} {} in {} seconds".format(
+            chassis_name, autoload_status["status"], autoload_status["elapsed"]))
+        # returns the job result or raises its error
+        api.AutoLoad(chassis_name)
+
+    def _setup_chassis(self, sandbox, chassis_name):
+        """Autoload the chassis and immediately remap its connections to the discovered ports
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :param str chassis_name:
+        :rtype: IxVMChassisSetupResult
+        """
+        api = sandbox.automation_api
+
+        try:
+            sandbox.logger.info("Executing Autoload command on IxVM chassis {}".format(chassis_name))
+            self._autoload_chassis(sandbox, chassis_name)
+
+            sandbox.logger.info("Executing Connect Child Resources command on IxVM chassis {}".format(chassis_name))
+            remap_result = api.RemapConnections(reservationId=sandbox.id,
+                                                resourcesFullPath=[chassis_name],
+                                                printOutput=True)
+
+            failed_items = [item for item in remap_result.ResultItems if not item.Success]
+
+            if failed_items:
+                raise Exception("Connections remapping failed due to {}".format(failed_items[0].Error))
+
+        except Exception as e:
+            sandbox.logger.exception("Failed to setup IxVM chassis {}".format(chassis_name))
+            self._write_message(sandbox, 'IxVM chassis "{}" setup failed: {}'.format(chassis_name, e))
+            api.SetResourceLiveStatus(chassis_name, "Error", "Discovery failed")
+
+            return IxVMChassisSetupResult(chassis_name=chassis_name, error=e)
+
+        self._write_message(sandbox, 'IxVM chassis "{}" is discovered and connected'.format(chassis_name))
+
+        return IxVMChassisSetupResult(chassis_name=chassis_name)
+
+    def configure_ixvm_chassis(self, sandbox, components):
+        """
+
+        :param cloudshell.workflow.orchestration.sandbox.Sandbox sandbox:
+        :param components:
+        :return:
+        """
+        chassis_names = self._get_chassis_names(sandbox)
+
+        if not chassis_names:
+            sandbox.logger.info("No IxVM chassis to discover")
+            return
+
+        max_concurrency = min(self._get_max_concurrency(sandbox), len(chassis_names))
+
+        self._write_message(sandbox, "IxVM chassis are being discovered...")
+        sandbox.logger.info("Setup {} IxVM chassis with concurrency {}".format(len(chassis_names), max_concurrency))
+
+        pool = ThreadPool(max_concurrency)
+
+        try:
+            results = pool.map(lambda chassis_name: self._setup_chassis(sandbox, chassis_name), chassis_names)
+        finally:
+            pool.terminate()
+
+        failed_chassis = [result.chassis_name for result in results if not result.succeeded]
+
+        if failed_chassis:
+            raise Exception("Sandbox is Active with Errors - IxVM chassis setup failed: {}".format(
+                ", ".join(failed_chassis)))
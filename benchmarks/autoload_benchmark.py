@@ -0,0 +1,326 @@
+"""Autoload benchmark against the local IxOS simulator
+
+Reports autoload wall-clock time, HTTP requests count and peak memory while the chassis size
+and the amount of the concurrent autoloads grow. Every scenario runs in its own Python process,
+so its peak memory isn't hidden by the peak of the previous scenarios. The inventory
+scenarios only wait for the REST service and fetch the inventory, the driver scenario runs the whole driver
+Autoload: the pipeline, the license server CLI flow with the ixServer restart and the
+autoload details building
+
+Usage: python benchmarks/autoload_benchmark.py [--latency SECONDS] [--boot-delay SECONDS] [--populate-delay SECONDS]
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from driver import SHELL_NAME  # noqa: E402
+from driver import SHELL_TYPE  # noqa: E402
+from traffic.ixvm.vchassis.api.client import IxVMChassisHTTPClient  # noqa: E402
+from traffic.ixvm.vchassis.api.session_cache import ApiKeyCache  # noqa: E402
+from traffic.ixvm.vchassis.autoload.structure_cache import AutoloadDetailsCache  # noqa: E402
+from traffic.ixvm.vchassis.configuration_attributes_structure import IxVMVChassisResource  # noqa: E402
+from traffic.ixvm.vchassis.deadline import Deadline  # noqa: E402
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbe  # noqa: E402
+from traffic.ixvm.vchassis.probes.readiness import wait_for_chassis_structure  # noqa: E402
+from traffic.ixvm.vchassis.runners.autoload_runner import IxVMAutoloadRunner  # noqa: E402
+from traffic.ixvm.vchassis.runners.configuration_runner import IxVMConfigurationRunner  # noqa: E402
+
+from ixos_simulator import IxOSSimulator  # noqa: E402
+from ixos_simulator import IxVMCliSimulator  # noqa: E402
+
+
+PORTS_COUNTS = (1, 10, 100, 1000, 4000)
+CONCURRENT_AUTOLOADS = (1, 5, 10, 25, 50)
+DRIVER_CONCURRENT_AUTOLOADS = (1, 5, 10)
+LICENSE_SERVER = "192.0.2.1"
+POLL_INTERVAL = 0.1
+CHASSIS_TIMEOUT = 10 * 60
+
+
+class SimulatedCliConfigurationRunner(IxVMConfigurationRunner):
+    def __init__(self, cli_simulator, **kwargs):
+        """Configuration runner that sends the CLI commands to the chassis CLI simulator
+
+        :param ixos_simulator.IxVMCliSimulator cli_simulator:
+        """
+        super(SimulatedCliConfigurationRunner, self).__init__(cli=None, cs_api=None, **kwargs)
+        self._cli_handler = cli_simulator
+
+
+def get_peak_memory():
+    """Peak resident memory of the scenario process in MB
+
+    :rtype: float
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _fetch_inventory(simulator, logger):
+    """Wait for the REST service of the simulated chassis, log in and fetch its inventory
+
+    :param IxOSSimulator simulator:
+    :param logging.Logger logger:
+    :return: fetch duration in seconds and the error if it failed
+    :rtype: tuple[float, Exception]
+    """
+    deadline = Deadline(budget=CHASSIS_TIMEOUT)
+    # API keys of the previous scenario simulators must not be reused
+    api_client = IxVMChassisHTTPClient(address=simulator.address,
+                                       user=simulator.user,
+                                       password=simulator.password,
+                                       scheme="http",
+                                       port=simulator.port,
+                                       api_keys_cache=ApiKeyCache(),
+                                       deadline=deadline)
+    start_time = time.time()
+
+    try:
+        ReadinessProbe(host=simulator.address,
+                       port=simulator.port,
+                       check=lambda: api_client.check_if_service_is_deployed(logger),
+                       logger=logger,
+                       timeout=CHASSIS_TIMEOUT,
+                       min_interval=POLL_INTERVAL,
+                       max_interval=1,
+                       tcp_poll_interval=POLL_INTERVAL,
+                       deadline=deadline).wait()
+        api_client.login()
+        wait_for_chassis_structure(api_client=api_client,
+                                   logger=logger,
+                                   timeout=CHASSIS_TIMEOUT,
+                                   poll_interval=POLL_INTERVAL,
+                                   stability_interval=POLL_INTERVAL,
+                                   cancel_event=threading.Event(),
+                                   deadline=deadline)
+    except Exception as e:
+        logger.exception("Inventory fetch of the chassis {} failed".format(simulator.address))
+        return time.time() - start_time, e
+
+    return time.time() - start_time, None
+
+
+def run_scenario(logger, chassis_count, ports_per_card, cards=1, latency=0, boot_delay=0, populate_delay=0):
+    """Fetch inventory of the given amount of the simulated chassis concurrently
+
+    :rtype: dict
+    """
+    simulators = [IxOSSimulator(address="127.0.0.{}".format(index + 1),
+                                cards=cards,
+                                ports_per_card=ports_per_card,
+                                latency=latency,
+                                boot_delay=boot_delay,
+                                populate_delay=populate_delay)
+                  for index in xrange(chassis_count)]
+
+    for simulator in simulators:
+        simulator.start()
+
+    pool = ThreadPool(chassis_count)
+    start_time = time.time()
+
+    try:
+        results = pool.map(lambda simulator: _fetch_inventory(simulator=simulator, logger=logger), simulators)
+        elapsed = time.time() - start_time
+    finally:
+        pool.terminate()
+
+        for simulator in simulators:
+            simulator.stop()
+
+    return {
+        "chassis": chassis_count,
+        "ports": cards * ports_per_card,
+        "wall_clock": elapsed,
+        "max_chassis_time": max(chassis_time for chassis_time, _ in results),
+        "http_requests": sum(simulator.requests_count for simulator in simulators),
+        "peak_memory_mb": get_peak_memory(),
+        "failed": len([error for _, error in results if error is not None]),
+    }
+
+
+def _discover_chassis(simulator, cli_simulator, logger, autoload_cache):
+    """Run the driver Autoload of the simulated chassis
+
+    :param IxOSSimulator simulator:
+    :param IxVMCliSimulator cli_simulator:
+    :param logging.Logger logger:
+    :param AutoloadDetailsCache autoload_cache:
+    :return: autoload duration in seconds and the error if it failed
+    :rtype: tuple[float, Exception]
+    """
+    attributes = {"{}.{}".format(SHELL_NAME, name): value for name, value in (
+        ("User", simulator.user),
+        ("Password", simulator.password),
+        # CLI readiness is probed on the simulator port, the CLI itself is simulated
+        ("CLI TCP Port", simulator.port),
+        ("Service Poll Min Interval", "0.1"),
+        ("Service Poll Max Interval", "1"))}
+    attributes["{}.License Server".format(SHELL_TYPE)] = LICENSE_SERVER
+
+    resource_config = IxVMVChassisResource(address=simulator.address,
+                                           shell_type=SHELL_TYPE,
+                                           shell_name=SHELL_NAME,
+                                           fullname="ixvm-{}".format(simulator.address),
+                                           name="ixvm-{}".format(simulator.address),
+                                           attributes=attributes)
+    deadline = Deadline(budget=resource_config.autoload_timeout)
+    api_client = IxVMChassisHTTPClient(address=simulator.address,
+                                       user=simulator.user,
+                                       password=simulator.password,
+                                       scheme="http",
+                                       port=simulator.port,
+                                       api_keys_cache=ApiKeyCache(),
+                                       deadline=deadline)
+    configuration_runner = SimulatedCliConfigurationRunner(cli_simulator=cli_simulator,
+                                                           resource_config=resource_config,
+                                                           logger=logger,
+                                                           deadline=deadline)
+    autoload_runner = IxVMAutoloadRunner(api_client=api_client,
+                                         configuration_runner=configuration_runner,
+                                         resource_config=resource_config,
+                                         shell_type=SHELL_TYPE,
+                                         logger=logger,
+                                         autoload_cache=autoload_cache,
+                                         deadline=deadline)
+    start_time = time.time()
+
+    try:
+        autoload_runner.discover()
+    except Exception as e:
+        logger.exception("Autoload of the chassis {} failed".format(simulator.address))
+        return time.time() - start_time, e
+
+    return time.time() - start_time, None
+
+
+def run_driver_scenario(logger, chassis_count, ports_per_card, cards=1, latency=0, restart_delay=0):
+    """Run the driver Autoload of the given amount of the simulated chassis concurrently
+
+    :rtype: dict
+    """
+    simulators = [IxOSSimulator(address="127.0.0.{}".format(index + 1),
+                                cards=cards,
+                                ports_per_card=ports_per_card,
+                                latency=latency,
+                                restart_delay=restart_delay)
+                  for index in xrange(chassis_count)]
+    cli_simulators = [IxVMCliSimulator(simulator=simulator, latency=latency) for simulator in simulators]
+
+    for simulator in simulators:
+        simulator.start()
+
+    autoload_cache = AutoloadDetailsCache()
+    pool = ThreadPool(chassis_count)
+    start_time = time.time()
+
+    try:
+        results = pool.map(lambda simulators_pair: _discover_chassis(simulator=simulators_pair[0],
+                                                                     cli_simulator=simulators_pair[1],
+                                                                     logger=logger,
+                                                                     autoload_cache=autoload_cache),
+                           zip(simulators, cli_simulators))
+        elapsed = time.time() - start_time
+    finally:
+        pool.terminate()
+
+        for simulator in simulators:
+            simulator.stop()
+
+    return {
+        "chassis": chassis_count,
+        "ports": cards * ports_per_card,
+        "wall_clock": elapsed,
+        "max_chassis_time": max(chassis_time for chassis_time, _ in results),
+        "http_requests": sum(simulator.requests_count for simulator in simulators),
+        "cli_commands": sum(len(cli_simulator.commands) for cli_simulator in cli_simulators),
+        "peak_memory_mb": get_peak_memory(),
+        "failed": len([error for _, error in results if error is not None]),
+    }
+
+
+SCENARIOS = {"inventory": run_scenario, "driver": run_driver_scenario}
+
+
+def run_isolated(scenario, **kwargs):
+    """Run the scenario in the new Python process and get its results
+
+    :param str scenario: scenario name
+    :rtype: dict
+    """
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                      "--scenario", scenario,
+                                      "--scenario-params", json.dumps(kwargs)])
+    return json.loads(output.splitlines()[-1])
+
+
+def print_results(title, results):
+    print(title)
+    print("{:>8} {:>8} {:>12} {:>14} {:>14} {:>13} {:>16} {:>7}".format(
+        "chassis", "ports", "wall clock,s", "max chassis,s", "HTTP requests", "CLI commands", "peak memory,MB",
+        "failed"))
+
+    for result in results:
+        print("{chassis:>8} {ports:>8} {wall_clock:>12.3f} {max_chassis_time:>14.3f} {http_requests:>14} "
+              "{cli_commands:>13} {peak_memory_mb:>16.1f} {failed:>7}".format(**dict({"cli_commands": "-"},
+                                                                                   **result)))
+    print("")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0, help="HTTP response latency in seconds")
+    parser.add_argument("--boot-delay", type=float, default=0, help="chassis REST API boot delay in seconds")
+    parser.add_argument("--populate-delay", type=float, default=0,
+                        help="seconds while the chassis ports list is gradually populated")
+    parser.add_argument("--restart-delay", type=float, default=1,
+                        help="seconds the chassis REST API is down after the ixServer restart")
+    # one scenario run in the separate process
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--scenario-params", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.scenario:
+        result = SCENARIOS[args.scenario](logger=logging.getLogger("autoload_benchmark"),
+                                          **json.loads(args.scenario_params))
+        print(json.dumps(result))
+        sys.stdout.flush()
+        # keep-alive handler threads of the stopped simulators would fail during the interpreter shutdown
+        os._exit(0)
+
+    print_results("Chassis size", [run_isolated("inventory",
+                                                chassis_count=1,
+                                                ports_per_card=ports_count,
+                                                latency=args.latency,
+                                                boot_delay=args.boot_delay,
+                                                populate_delay=args.populate_delay)
+                                   for ports_count in PORTS_COUNTS])
+
+    print_results("Concurrent autoloads", [run_isolated("inventory",
+                                                        chassis_count=chassis_count,
+                                                        ports_per_card=8,
+                                                        latency=args.latency,
+                                                        boot_delay=args.boot_delay,
+                                                        populate_delay=args.populate_delay)
+                                           for chassis_count in CONCURRENT_AUTOLOADS])
+
+    print_results("Driver autoload", [run_isolated("driver",
+                                                   chassis_count=chassis_count,
+                                                   ports_per_card=8,
+                                                   latency=args.latency,
+                                                   restart_delay=args.restart_delay)
+                                      for chassis_count in DRIVER_CONCURRENT_AUTOLOADS])
+
+
+if __name__ == "__main__":
+    main()
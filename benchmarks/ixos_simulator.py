@@ -0,0 +1,289 @@
+"""Local stand-in for the IxVM chassis REST API and CLI
+
+Simulates the 'platform/api/v1/auth/session' and 'chassis/api/v2/ixos/*' endpoints over HTTP
+and the license server CLI commands with configurable boot delay, latency and chassis size
+"""
+import BaseHTTPServer
+import SocketServer
+import StringIO
+import gzip
+import json
+import socket
+import threading
+import time
+import urlparse
+import uuid
+
+
+REST_PORT = 8443
+
+
+class _ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, *args, **kwargs):
+        BaseHTTPServer.HTTPServer.__init__(self, *args, **kwargs)
+        self.connections = set()
+
+    def process_request(self, request, client_address):
+        self.connections.add(request)
+        SocketServer.ThreadingMixIn.process_request(self, request, client_address)
+
+    def shutdown_request(self, request):
+        self.connections.discard(request)
+        BaseHTTPServer.HTTPServer.shutdown_request(self, request)
+
+    def close_connections(self):
+        """Drop keep-alive connections of the clients"""
+        for request in list(self.connections):
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+
+class _IxOSRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+
+        if "gzip" in (self.headers.getheader("Accept-Encoding") or ""):
+            buf = StringIO.StringIO()
+            with gzip.GzipFile(fileobj=buf, mode="wb") as gzip_file:
+                gzip_file.write(body)
+            body = buf.getvalue()
+            self.send_header("Content-Encoding", "gzip")
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        simulator = self.server.simulator
+        simulator.register_request(method, self.path)
+        time.sleep(simulator.latency)
+
+        if method == "POST":
+            body = self.rfile.read(int(self.headers.getheader("Content-Length", 0)))
+        else:
+            body = None
+
+        status, data = simulator.handle_request(method=method,
+                                                path=self.path,
+                                                api_key=self.headers.getheader("x-api-key"),
+                                                body=body)
+        self._send_json(status, data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class IxOSSimulator(object):
+    def __init__(self, address="127.0.0.1", port=REST_PORT, cards=1, ports_per_card=4, boot_delay=0,
+                 latency=0, restart_delay=0, populate_delay=0, user="admin", password="admin"):
+        """
+
+        :param str address: address to listen on
+        :param int port: REST API TCP port
+        :param int cards: amount of the chassis cards
+        :param int ports_per_card: amount of the ports on the each card
+        :param float boot_delay: seconds before the REST API port opens
+        :param float latency: delay in seconds added to the each HTTP response
+        :param float restart_delay: seconds the REST API is down after the ixServer restart
+        :param float populate_delay: seconds after the REST API start while the ports list is gradually populated
+        :param str user: REST API username
+        :param str password: REST API password
+        """
+        self.address = address
+        self.port = port
+        self.latency = latency
+        self.boot_delay = boot_delay
+        self.restart_delay = restart_delay
+        self.populate_delay = populate_delay
+        self.user = user
+        self.password = password
+        self.license_server = None
+        self.requests_count = 0
+        self.requests_by_path = {}
+
+        self._api_keys = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._server_thread = None
+        self._available_time = None
+
+        self._chassis = [{"id": 1, "ip": address}]
+        self._cards = [{"id": 100 + card_number, "cardNumber": card_number}
+                       for card_number in xrange(1, cards + 1)]
+        self._ports = [{"id": 10000 + card["cardNumber"] * 1000 + port_number,
+                        "parentId": card["id"],
+                        "portNumber": port_number,
+                        "linkState": "linkUp",
+                        "speed": 10000}
+                       for card in self._cards
+                       for port_number in xrange(1, ports_per_card + 1)]
+
+    def register_request(self, method, path):
+        """
+
+        :param str method:
+        :param str path:
+        """
+        with self._lock:
+            self.requests_count += 1
+            key = "{} {}".format(method, path.split("?")[0])
+            self.requests_by_path[key] = self.requests_by_path.get(key, 0) + 1
+
+    def _get_visible_ports(self):
+        """Ports already reported by the REST API, half of them are missing in the middle of the populating
+
+        :rtype: list[dict]
+        """
+        if not self.populate_delay:
+            return self._ports
+
+        populated = min(1.0, (time.time() - self._available_time) / self.populate_delay)
+        return self._ports[:int(len(self._ports) * populated)]
+
+    def handle_request(self, method, path, api_key, body):
+        """
+
+        :return: tuple with HTTP status code and JSON data
+        :rtype: tuple[int, object]
+        """
+        url = urlparse.urlparse(path)
+        path = url.path.strip("/")
+        properties = urlparse.parse_qs(url.query).get("properties")
+
+        if time.time() < self._available_time:
+            return 503, {"error": "Service is starting"}
+
+        if method == "POST" and path == "platform/api/v1/auth/session":
+            data = json.loads(body)
+            if data.get("username") != self.user or data.get("password") != self.password:
+                return 401, {"error": "Invalid credentials"}
+
+            api_key = uuid.uuid4().hex
+            self._api_keys.add(api_key)
+            return 200, {"apiKey": api_key}
+
+        resources = {
+            "chassis/api/v2/ixos/chassis": self._chassis,
+            "chassis/api/v2/ixos/cards": self._cards,
+            "chassis/api/v2/ixos/ports": self._get_visible_ports(),
+        }
+
+        if method == "GET" and path in resources:
+            if api_key not in self._api_keys:
+                return 401, {"error": "Unauthorized"}
+            if properties:
+                fields = properties[0].split(",")
+                return 200, [{field: record[field] for field in fields if field in record}
+                             for record in resources[path]]
+
+            return 200, resources[path]
+
+        return 404, {"error": "Not found"}
+
+    def _serve(self):
+        if self.boot_delay:
+            time.sleep(self.boot_delay)
+            self._server.server_activate()
+
+        self._server.serve_forever(poll_interval=0.1)
+
+    def start(self):
+        """Start simulator, REST API port opens after the boot delay"""
+        self._available_time = time.time() + self.boot_delay
+        self._server = _ThreadingHTTPServer((self.address, self.port), _IxOSRequestHandler,
+                                            bind_and_activate=False)
+        self._server.simulator = self
+        self._server.server_bind()
+        self.port = self._server.server_address[1]
+
+        if not self.boot_delay:
+            self._server.server_activate()
+
+        self._server_thread = threading.Thread(target=self._serve, name="ixos-simulator-{}".format(self.address))
+        self._server_thread.daemon = True
+        self._server_thread.start()
+
+    def stop(self):
+        """Stop simulator"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._server.close_connections()
+
+    def restart_service(self):
+        """Simulate the ixServer restart: REST API is unavailable and all API keys are invalidated"""
+        with self._lock:
+            self._api_keys.clear()
+            self._available_time = time.time() + self.restart_delay
+
+
+class _CliSessionStub(object):
+    def __init__(self):
+        """Stand-in for the pooled CLI session, tracks whether it can be returned to the pool"""
+        self.active = True
+
+    def set_active(self, active):
+        self.active = active
+
+
+class IxVMCliSimulator(object):
+    PROMPT = "#"
+    cli_mode = None
+
+    def __init__(self, simulator, latency=0):
+        """Stand-in for the CLI handler and CLI service with the IxVM console prompts
+
+        :param IxOSSimulator simulator: simulator of the same chassis
+        :param float latency: delay in seconds added to the each command
+        """
+        self._simulator = simulator
+        self._latency = latency
+        self.commands = []
+        self.session = _CliSessionStub()
+
+    def send_command(self, command, expected_string=None, action_map=None, error_map=None, logger=None,
+                     *args, **kwargs):
+        """
+
+        :param str command:
+        :rtype: str
+        """
+        self.commands.append(command)
+        time.sleep(self._latency)
+
+        if command == "show license-server":
+            output = "License server: {}".format(self._simulator.license_server or "")
+        elif command.startswith("set license-server "):
+            self._simulator.license_server = command.split(" ", 2)[2]
+            output = ""
+        elif command == "restart-service ixServer":
+            self._simulator.restart_service()
+            output = "Restarting ixServer"
+        else:
+            output = "error: unknown command"
+
+        return "{}\n{}\n{}".format(command, output, self.PROMPT)
+
+    def get_cli_service(self, command_mode):
+        self.session = _CliSessionStub()
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
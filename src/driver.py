@@ -1,26 +1,23 @@
 import json
-import time
-from datetime import datetime
-from datetime import timedelta
+import logging
 
 from cloudshell.core.context.error_handling_context import ErrorHandlingContext
-from cloudshell.devices.autoload.autoload_builder import AutoloadDetailsBuilder
-from cloudshell.devices.driver_helper import get_api
-from cloudshell.devices.driver_helper import get_cli
-from cloudshell.devices.driver_helper import get_logger_with_thread_id
-from cloudshell.devices.standards.traffic.virtual.chassis.configuration_attributes_structure import TrafficGeneratorVChassisResource
 from cloudshell.shell.core.driver_context import AutoLoadDetails
 from cloudshell.shell.core.resource_driver_interface import ResourceDriverInterface
 from cloudshell.traffic.virtual.resource_driver_interface import VirtualTrafficGeneratorResourceDriverInterface
-from cloudshell.traffic.virtual.runners.connect_child_resources import ConnectChildResourcesRunner
 
-from traffic.ixvm.vchassis.api.client import IxVMChassisHTTPClient
-from traffic.ixvm.vchassis.autoload import models
-from traffic.ixvm.vchassis.runners.configuration_runner import IxVMConfigurationRunner
+from traffic.ixvm.vchassis.cli.session_pool import drop_resource_cli
+from traffic.ixvm.vchassis.cli.session_pool import get_resource_cli
+from traffic.ixvm.vchassis.configuration_attributes_structure import IxVMVChassisResource
+from traffic.ixvm.vchassis.deadline import Deadline
+from traffic.ixvm.vchassis.driver_helper import get_api
+from traffic.ixvm.vchassis.driver_helper import get_inventory_logger
+from traffic.ixvm.vchassis.driver_helper import get_logger_with_thread_id
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+from traffic.ixvm.vchassis.profiling import CommandProfiler
+from traffic.ixvm.vchassis.profiling import is_profiling_enabled
 
 
-SERVICE_STARTING_TIMEOUT = 60 * 60
-CHASSIS_STRUCTURE_APPEARANCE_TIMEOUT = 10 * 60
 SHELL_TYPE = "CS_VirtualTrafficGeneratorChassis"
 SHELL_NAME = "IxVM Virtual Traffic Chassis 2G"
 MODULE_MODEL = "{}.VirtualTrafficGeneratorModule".format(SHELL_NAME)
@@ -31,6 +28,8 @@ class IxVMVirtualChassisDriver(ResourceDriverInterface, VirtualTrafficGeneratorR
     def __init__(self):
         """Constructor must be without arguments, it is created with reflection at run time"""
         self._cli = None
+        self._resource_name = None
+        self._prefetch_started = False
 
     def initialize(self, context):
         """Initialize the driver session, this function is called everytime a new instance of the driver is created.
@@ -38,47 +37,85 @@ class IxVMVirtualChassisDriver(ResourceDriverInterface, VirtualTrafficGeneratorR
         This is a good place to load and cache the driver configuration, initiate sessions etc.
         :param InitCommandContext context: the context the command runs on
         """
-        resource_config = TrafficGeneratorVChassisResource.from_context(context,
-                                                                        shell_type=SHELL_TYPE,
-                                                                        shell_name=SHELL_NAME)
-        self._cli = get_cli(resource_config.sessions_concurrency_limit)
-        return "Finished initializing"
+        resource_config = IxVMVChassisResource.from_context(context,
+                                                            shell_type=SHELL_TYPE,
+                                                            shell_name=SHELL_NAME)
+        self._resource_name = resource_config.fullname
+        self._cli = get_resource_cli(resource_name=resource_config.fullname,
+                                     sessions_concurrency_limit=resource_config.sessions_concurrency_limit)
 
-    @staticmethod
-    def _wait_for_service_deployment(api_client, logger):
-        """
+        if (resource_config.inventory_prefetch and resource_config.address and
+                resource_config.address.upper() != "NA"):
+            self._start_prefetch(context, resource_config)
 
-        :param api_client:
-        :param logger:
-        :return:
-        """
-        timeout_time = datetime.now() + timedelta(seconds=SERVICE_STARTING_TIMEOUT)
+        return "Finished initializing"
+
+    def _start_prefetch(self, context, resource_config):
+        """Start the inventory prefetch of the not yet discovered resource, initialization never fails because of it
 
-        while not api_client.check_if_service_is_deployed(logger):
-            logger.info("Waiting for controller service start...")
+        Command logger can't be created for the initialization context, so the prefetch
+        creates its own logger of the inventory log group on the worker thread
 
-            if datetime.now() > timeout_time:
-                raise Exception("IxVM Chassis service didn't start within {} minute(s)"
-                                .format(SERVICE_STARTING_TIMEOUT / 60))
-            time.sleep(10)
+        :param InitCommandContext context:
+        :param IxVMVChassisResource resource_config:
+        """
+        try:
+            from traffic.ixvm.vchassis.autoload.structure_cache import autoload_details_cache
+            from traffic.ixvm.vchassis.runners.inventory_prefetch import inventory_prefetch_registry
 
-    @staticmethod
-    def _wait_for_chassis_structure(api_client, logger):
-        """Will wait while chassis structure appears
+            if autoload_details_cache.get_last(resource_config.fullname) is not None:
+                # driver instances of the other commands of the discovered resource don't need the inventory
+                return
 
-        :param api_client:
-        :param logger:
-        :return:
+            inventory_prefetch_registry.start(resource_name=resource_config.fullname,
+                                              prefetch_func=lambda cancel_event, logger: self._prefetch_inventory(
+                                                  context, resource_config, logger, cancel_event),
+                                              logger_factory=lambda: get_inventory_logger(resource_config.name))
+            self._prefetch_started = True
+        except Exception:
+            # prefetch is optional, the Autoload fetches the inventory itself
+            try:
+                get_inventory_logger(resource_config.name).warning("Failed to start inventory prefetch",
+                                                                   exc_info=True)
+            except Exception:
+                pass
+
+    def _prefetch_inventory(self, context, resource_config, logger, cancel_event):
+        """Wait for the Chassis REST service and fetch the inventory before the Autoload is called
+
+        :param InitCommandContext context:
+        :param IxVMVChassisResource resource_config:
+        :param logging.Logger logger:
+        :param threading.Event cancel_event:
+        :rtype: traffic.ixvm.vchassis.api.client.InventorySnapshot
         """
-        timeout_time = datetime.now() + timedelta(seconds=CHASSIS_STRUCTURE_APPEARANCE_TIMEOUT)
+        from traffic.ixvm.vchassis.api.client import IxVMChassisHTTPClient
+        from traffic.ixvm.vchassis.runners.autoload_runner import IxVMAutoloadRunner
+
+        metrics = CommandMetrics(command="inventory_prefetch", resource_name=resource_config.fullname)
 
-        while not (api_client.get_cards() and api_client.get_ports()):
-            logger.info("Waiting for chassis structure appearance...")
+        try:
+            cs_api = get_api(context)
+            password = cs_api.DecryptPassword(resource_config.password).Value
+            deadline = Deadline(budget=resource_config.autoload_timeout)
 
-            if datetime.now() > timeout_time:
-                raise Exception("Chassis data from IxVM Chassis service is empty and didn't appear within {}"
-                                .format(CHASSIS_STRUCTURE_APPEARANCE_TIMEOUT / 60))
-            time.sleep(10)
+            api_client = IxVMChassisHTTPClient(address=resource_config.address,
+                                               user=resource_config.user,
+                                               password=password,
+                                               metrics=metrics,
+                                               deadline=deadline)
+
+            autoload_operations = IxVMAutoloadRunner(api_client=api_client,
+                                                     configuration_runner=None,
+                                                     resource_config=resource_config,
+                                                     shell_type=SHELL_TYPE,
+                                                     logger=logger,
+                                                     metrics=metrics,
+                                                     deadline=deadline)
+
+            return autoload_operations.prefetch_inventory(cancel_event)
+        finally:
+            metrics.publish(logger)
 
     def get_inventory(self, context):
         """Discovers the resource structure and attributes.
@@ -92,14 +129,74 @@ class IxVMVirtualChassisDriver(ResourceDriverInterface, VirtualTrafficGeneratorR
 
         with ErrorHandlingContext(logger):
 
-            resource_config = TrafficGeneratorVChassisResource.from_context(context,
-                                                                            shell_type=SHELL_TYPE,
-                                                                            shell_name=SHELL_NAME)
+            resource_config = IxVMVChassisResource.from_context(context,
+                                                                shell_type=SHELL_TYPE,
+                                                                shell_name=SHELL_NAME)
 
             if not resource_config.address or resource_config.address.upper() == "NA":
                 logger.info("Skip 'Autoload' command for now...")
                 return AutoLoadDetails([], [])
 
+            if not resource_config.background_autoload:
+                return self._discover(context, resource_config, logger)
+
+            from traffic.ixvm.vchassis.autoload.structure_cache import autoload_details_cache
+            from traffic.ixvm.vchassis.runners.autoload_jobs import AutoloadJobInProgress
+            from traffic.ixvm.vchassis.runners.autoload_jobs import autoload_job_manager
+
+            job = autoload_job_manager.get(resource_config.fullname)
+
+            if job is not None and job.is_finished:
+                autoload_job_manager.pop(resource_config.fullname)
+
+                if job.result_age < resource_config.autoload_timeout:
+                    logger.info("Background Autoload job {}, returning its result".format(job.status))
+                    return job.get_result()
+
+                # structure of the chassis could be changed since the job finished
+                logger.info("Background Autoload job {} {} second(s) ago, its result is outdated, "
+                            "starting the new job".format(job.status, int(job.result_age)))
+
+            job = autoload_job_manager.submit(resource_name=resource_config.fullname,
+                                              func=lambda progress: self._discover(
+                                                  context, resource_config, logger, progress))
+
+            autoload_details = autoload_details_cache.get_last(resource_config.fullname)
+
+            if autoload_details is None:
+                # empty details would remove the existing sub-resources and their connections
+                raise AutoloadJobInProgress(resource_name=resource_config.fullname, status=job.status)
+
+            logger.info("Background Autoload job is {}, returning the last known structure".format(job.status))
+            return autoload_details
+
+    def _discover(self, context, resource_config, logger, progress=None):
+        """Discover the resource structure and attributes
+
+        :param AutoLoadCommandContext context:
+        :param IxVMVChassisResource resource_config:
+        :param logging.Logger logger:
+        :param traffic.ixvm.vchassis.autoload.pipeline.AutoloadProgress progress: progress of the autoload phases
+        :rtype: AutoLoadDetails
+        """
+        # heavy dependencies are imported only when the command really needs them
+        from traffic.ixvm.vchassis.api.client import IxVMChassisHTTPClient
+        from traffic.ixvm.vchassis.runners.autoload_runner import IxVMAutoloadRunner
+        from traffic.ixvm.vchassis.runners.configuration_runner import IxVMConfigurationRunner
+        from traffic.ixvm.vchassis.runners.inventory_prefetch import inventory_prefetch_registry
+        from traffic.ixvm.vchassis.runners.port_status_runner import port_status_cache
+
+        metrics = CommandMetrics(command="get_inventory", resource_name=resource_config.fullname)
+        deadline = Deadline(budget=resource_config.autoload_timeout)
+        profiler = CommandProfiler(command="get_inventory",
+                                   resource_name=resource_config.fullname,
+                                   reservation_id=None,
+                                   logger=logger,
+                                   enabled=is_profiling_enabled("get_inventory",
+                                                                resource_config.profiling_enabled))
+        profiler.start()
+
+        try:
             cs_api = get_api(context)
             password = cs_api.DecryptPassword(resource_config.password).Value
 
@@ -107,76 +204,123 @@ class IxVMVirtualChassisDriver(ResourceDriverInterface, VirtualTrafficGeneratorR
 
             api_client = IxVMChassisHTTPClient(address=resource_config.address,
                                                user=resource_config.user,
-                                               password=password)
-
-            logger.info("Waiting for API service to be deployed")
-            self._wait_for_service_deployment(api_client, logger)
+                                               password=password,
+                                               metrics=metrics,
+                                               deadline=deadline)
 
             configuration_operations = IxVMConfigurationRunner(resource_config=resource_config,
                                                                cli=self._cli,
                                                                cs_api=cs_api,
-                                                               logger=logger)
-
-            logger.info("Executing congfigure license server operation")
-            configuration_operations.configure_license_server(license_server_ip=resource_config.license_server)
-
-            logger.info("Performing API client login")
-            api_client.login()
-
-            logger.info("Waiting for the Chassis data")
-            self._wait_for_chassis_structure(api_client, logger)
-
-            logger.info("Retrieving Chassis data from the API")
-            chassis_data = api_client.get_chassis()[0]
-            chassis_id = chassis_data["id"]
+                                                               logger=logger,
+                                                               metrics=metrics,
+                                                               deadline=deadline)
+
+            autoload_operations = IxVMAutoloadRunner(api_client=api_client,
+                                                     configuration_runner=configuration_operations,
+                                                     resource_config=resource_config,
+                                                     shell_type=SHELL_TYPE,
+                                                     logger=logger,
+                                                     metrics=metrics,
+                                                     deadline=deadline,
+                                                     prefetch=inventory_prefetch_registry.pop(
+                                                         resource_config.fullname),
+                                                     progress=progress)
+
+            logger.info("Discovering Chassis structure")
+            autoload_details = autoload_operations.discover()
+
+            # ports of the resource are replaced by the Autoload
+            port_status_cache.invalidate(resource_config.fullname)
+
+            return autoload_details
+        finally:
+            profiler.stop()
+            metrics.publish(logger)
+
+    def get_autoload_status(self, context):
+        """Get status and phases progress of the resource background Autoload job
 
-            chassis_res = models.IxVMChassis(shell_type=SHELL_TYPE,
-                                             shell_name=resource_config.shell_name,
-                                             name="IxVm Virtual Chassis {}".format(chassis_id),
-                                             unique_id=chassis_id)
+        :type context: cloudshell.shell.core.driver_context.ResourceCommandContext
+        :return: JSON with the job status, elapsed time, phases and error
+        :rtype: str
+        """
+        logger = get_logger_with_thread_id(context)
+        logger.info("Get Autoload Status command started")
 
-            ports_data = {}
-            for port_data in api_client.get_ports():
-                parent_id = port_data["parentId"]
-                port_number = port_data["portNumber"]
+        with ErrorHandlingContext(logger):
+            from traffic.ixvm.vchassis.runners.autoload_jobs import autoload_job_manager
 
-                ports_by_module = ports_data.setdefault(parent_id, [])
-                ports_by_module.append(port_data)
-                logger.info("Found Port {} under the parent id {}".format(port_number, parent_id))
+            job = autoload_job_manager.get(context.resource.fullname)
 
-            for module_data in api_client.get_cards():
-                module_id = module_data["id"]
-                module_number = module_data["cardNumber"]
+            if job is None:
+                return json.dumps({"status": "none"})
 
-                module_res = models.IxVMModule(shell_name=resource_config.shell_name,
-                                               name="IxVm Virtual Module {}".format(module_number),
-                                               unique_id=module_id)
+            return json.dumps(job.to_dict())
 
-                logger.info("Adding Module {} to the Chassis".format(module_number))
-                chassis_res.add_sub_resource(module_number, module_res)
+    def refresh_port_status(self, context):
+        """Update link state and speed of the resource ports without the full Autoload
 
-                ports_data = ports_data.get(module_id, [])
-                ports_data.sort(key=lambda x: int(x["portNumber"]))
+        :type context: cloudshell.shell.core.driver_context.ResourceCommandContext
+        :rtype: str
+        """
+        logger = get_logger_with_thread_id(context)
+        logger.info("Refresh Port Status command started")
 
-                for nw_adapter_number, port_data in enumerate(ports_data, start=2):  # first nw adapter port is MGMT
-                    port_id = port_data["id"]
-                    port_number = port_data["portNumber"]
+        with ErrorHandlingContext(logger):
+            resource_config = IxVMVChassisResource.from_context(context,
+                                                                shell_type=SHELL_TYPE,
+                                                                shell_name=SHELL_NAME)
 
-                    port_res = models.IxVMPort(shell_name=resource_config.shell_name,
-                                               name="Port {}".format(port_number),
-                                               unique_id=port_id)
-                    port_res.requested_vnic_name = nw_adapter_number
-                    logger.info("Adding Port {} under the module {}".format(port_number, module_id))
-                    module_res.add_sub_resource(port_number, port_res)
+            if not resource_config.address or resource_config.address.upper() == "NA":
+                logger.info("Skip 'Refresh Port Status' command for now...")
+                return
 
-            return AutoloadDetailsBuilder(chassis_res).autoload_details()
+            from traffic.ixvm.vchassis.api.client import IxVMChassisHTTPClient
+            from traffic.ixvm.vchassis.runners.port_status_runner import DEFAULT_PORT_STATUS_TIMEOUT
+            from traffic.ixvm.vchassis.runners.port_status_runner import IxVMPortStatusRunner
+
+            metrics = CommandMetrics(command="refresh_port_status", resource_name=resource_config.fullname)
+            profiler = CommandProfiler(command="refresh_port_status",
+                                       resource_name=resource_config.fullname,
+                                       reservation_id=context.reservation.reservation_id,
+                                       logger=logger,
+                                       enabled=is_profiling_enabled("refresh_port_status",
+                                                                    resource_config.profiling_enabled))
+            profiler.start()
+
+            try:
+                cs_api = get_api(context)
+                password = cs_api.DecryptPassword(resource_config.password).Value
+
+                api_client = IxVMChassisHTTPClient(address=resource_config.address,
+                                                   user=resource_config.user,
+                                                   password=password,
+                                                   metrics=metrics,
+                                                   deadline=Deadline(budget=DEFAULT_PORT_STATUS_TIMEOUT))
+
+                port_status_operations = IxVMPortStatusRunner(api_client=api_client,
+                                                              cs_api=cs_api,
+                                                              logger=logger,
+                                                              metrics=metrics)
+
+                return port_status_operations.refresh_port_status(resource_name=resource_config.fullname,
+                                                                  port_model=PORT_MODEL)
+            finally:
+                profiler.stop()
+                metrics.publish(logger)
 
     def cleanup(self):
         """ Destroy the driver session, this function is called everytime a driver instance is destroyed
         This is a good place to close any open sessions, finish writing to log files
         """
+        if self._prefetch_started:
+            from traffic.ixvm.vchassis.runners.inventory_prefetch import inventory_prefetch_registry
 
-        pass
+            inventory_prefetch_registry.cancel(self._resource_name)
+
+        if self._cli is not None:
+            drop_resource_cli(resource_name=self._resource_name, logger=logging.getLogger(__name__))
+            self._cli = None
 
     def connect_child_resources(self, context, request=None):
         """
@@ -188,29 +332,47 @@ class IxVMVirtualChassisDriver(ResourceDriverInterface, VirtualTrafficGeneratorR
         logger.info("Receive request {}".format(request))
 
         with ErrorHandlingContext(logger):
-            resource_config = TrafficGeneratorVChassisResource.from_context(context,
-                                                                            shell_type=SHELL_TYPE,
-                                                                            shell_name=SHELL_NAME)
+            resource_config = IxVMVChassisResource.from_context(context,
+                                                                shell_type=SHELL_TYPE,
+                                                                shell_name=SHELL_NAME)
 
             if not resource_config.address or resource_config.address.upper() == "NA":
                 logger.info("Skip 'Connect Child Resources' command for now...")
                 return
 
+            from traffic.ixvm.vchassis.runners.connect_child_resources_runner import IxVMConnectChildResourcesRunner
+
             resource_name = context.resource.fullname
             reservation_id = context.reservation.reservation_id
             connectors = context.connectors
-            api = get_api(context)
-
-            connect_operation = ConnectChildResourcesRunner(logger=logger,
-                                                            cs_api=api)
-
-            ports = connect_operation.get_ports(resource_name=resource_name,
-                                                port_model=PORT_MODEL)
-
-            return connect_operation.connect_child_resources(connectors=connectors,
-                                                             ports=ports,
-                                                             resource_name=resource_name,
-                                                             reservation_id=reservation_id)
+            metrics = CommandMetrics(command="connect_child_resources", resource_name=resource_name)
+            profiler = CommandProfiler(command="connect_child_resources",
+                                       resource_name=resource_name,
+                                       reservation_id=reservation_id,
+                                       logger=logger,
+                                       enabled=is_profiling_enabled("connect_child_resources",
+                                                                    resource_config.profiling_enabled))
+            profiler.start()
+
+            try:
+                api = get_api(context)
+
+                connect_operation = IxVMConnectChildResourcesRunner(logger=logger,
+                                                                    cs_api=api,
+                                                                    metrics=metrics)
+
+                with metrics.phase("get_ports"):
+                    ports = connect_operation.get_ports(resource_name=resource_name,
+                                                        port_model=PORT_MODEL)
+
+                with metrics.phase("connect_child_resources"):
+                    return connect_operation.connect_child_resources(connectors=connectors,
+                                                                     ports=ports,
+                                                                     resource_name=resource_name,
+                                                                     reservation_id=reservation_id)
+            finally:
+                profiler.stop()
+                metrics.publish(logger)
 
 if __name__ == "__main__":
     import mock
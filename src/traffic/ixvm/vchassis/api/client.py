@@ -1,10 +1,64 @@
 import httplib
+import time
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 import requests
 
+from traffic.ixvm.vchassis.api.connection_pool import DEFAULT_POOL_MAXSIZE
+from traffic.ixvm.vchassis.api.connection_pool import get_session
+from traffic.ixvm.vchassis.api.json_stream import iter_json_array
+from traffic.ixvm.vchassis.api.json_stream import project
+from traffic.ixvm.vchassis.api.session_cache import api_key_cache
+from traffic.ixvm.vchassis.deadline import Deadline
+from traffic.ixvm.vchassis.deadline import DeadlineExceeded
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+
+CHASSIS_FIELDS = ("id",)
+CARD_FIELDS = ("id", "cardNumber")
+PORT_FIELDS = ("id", "parentId", "portNumber")
+COUNT_FIELDS = ("id",)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StructureCounts(namedtuple("StructureCounts", ["cards", "ports"])):
+    """Amount of the cards and ports on the controller"""
+    __slots__ = ()
+
+    @property
+    def is_structure_ready(self):
+        """Whether chassis structure (cards and ports) already appeared
+
+        :rtype: bool
+        """
+        return bool(self.cards and self.ports)
+
+
+class InventorySnapshot(namedtuple("InventorySnapshot", ["chassis", "cards", "ports"])):
+    """Chassis, cards and ports data fetched from the controller in one round"""
+    __slots__ = ()
+
+    @property
+    def is_structure_ready(self):
+        """Whether chassis structure (cards and ports) already appeared
+
+        :rtype: bool
+        """
+        return bool(self.cards and self.ports)
+
+    @property
+    def counts(self):
+        """
+
+        :rtype: StructureCounts
+        """
+        return StructureCounts(cards=len(self.cards), ports=len(self.ports))
+
 
 class IxVMChassisHTTPClient(object):
-    def __init__(self, address, user=None, password=None, scheme="https", port=443, verify_ssl=False):
+    def __init__(self, address, user=None, password=None, scheme="https", port=443, verify_ssl=False,
+                 session=None, pool_size=DEFAULT_POOL_MAXSIZE, api_keys_cache=api_key_cache,
+                 metrics=None, deadline=None):
         """
         :param str address: controller IP address
         :param str user: controller username
@@ -12,26 +66,105 @@ class IxVMChassisHTTPClient(object):
         :param str scheme: protocol (http|https)
         :param int port: controller port
         :param bool verify_ssl: whether SSL cert will be verified or not
+        :param requests.Session session: session to use, by default the shared keep-alive session is used
+        :param int pool_size: max amount of the keep-alive connections to the controller
+        :param traffic.ixvm.vchassis.api.session_cache.ApiKeyCache api_keys_cache: API keys cache shared
+            between the clients
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics: metrics of the command the client is used in
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline: deadline of the command the client is used in,
+            connect and read timeouts of the each request are taken from its remaining budget
         """
+        self._address = address
+        self._port = port
         self._base_url = "{}://{}:{}".format(scheme, address, port)
-        self._headers = {"Content-Type": "application/json"}
+        self._headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
         self._user = user
         self._password = password
         self._verify_ssl = verify_ssl
+        self._session = session or get_session(pool_maxsize=pool_size)
+        self._api_keys_cache = api_keys_cache
+        self._metrics = metrics or CommandMetrics()
+        self._deadline = deadline or Deadline()
 
-    def _do_get(self, path, raise_for_status=True, **kwargs):
-        """Basic GET request client method
+    @property
+    def address(self):
+        """
+
+        :rtype: str
+        """
+        return self._address
 
+    @property
+    def port(self):
+        """
+
+        :rtype: int
+        """
+        return self._port
+
+    def _send(self, method, path, **kwargs):
+        """Send request and record its latency and size
+
+        :param str method: HTTP method name
         :param str path: path for the request
         :param dict kwargs: additional kwarg that would be passed to the requests lib
+        :raises traffic.ixvm.vchassis.deadline.DeadlineExceeded: if the command deadline is exceeded
         :rtype: requests.Response
         """
+        kwargs.setdefault("timeout", self._deadline.request_timeout())
+        endpoint = "{} {}".format(method, path)
         url = "{}/{}".format(self._base_url, path)
+        start_time = time.time()
+
+        try:
+            resp = self._session.request(method=method, url=url, headers=self._headers, **kwargs)
+        except Exception:
+            self._metrics.record("http", endpoint, time.time() - start_time, error=True)
+
+            if self._deadline.expired:
+                raise DeadlineExceeded(budget=self._deadline.budget)
+            raise
+
+        self._metrics.record(category="http",
+                             name=endpoint,
+                             latency=time.time() - start_time,
+                             bytes=int(resp.headers.get("Content-Length") or 0),
+                             error=resp.status_code >= httplib.BAD_REQUEST)
+        return resp
+
+    def _do_request(self, method, path, raise_for_status=True, reauth=True, **kwargs):
+        """Basic request client method
+
+        :param str method: HTTP method name (GET|POST|PUT|DELETE)
+        :param str path: path for the request
+        :param bool raise_for_status: whether raise an exception for the error status codes or not
+        :param bool reauth: whether log in again and retry the request once if the API key was rejected
+        :param dict kwargs: additional kwarg that would be passed to the requests lib
+        :rtype: requests.Response
+        """
         kwargs.update({"verify": self._verify_ssl})
-        resp = requests.get(url=url, headers=self._headers, **kwargs)
+        api_key = self._headers.get("x-api-key")
+        resp = self._send(method, path, **kwargs)
+
+        if reauth and api_key is not None and resp.status_code == httplib.UNAUTHORIZED:
+            resp.close()
+            self._metrics.increment("http_retries")
+            self._api_keys_cache.invalidate(address=self._address, user=self._user, api_key=api_key)
+            self._login()
+            resp = self._send(method, path, **kwargs)
+
         raise_for_status and resp.raise_for_status()
         return resp
 
+    def _do_get(self, path, raise_for_status=True, **kwargs):
+        """Basic GET request client method
+
+        :param str path: path for the request
+        :param dict kwargs: additional kwarg that would be passed to the requests lib
+        :rtype: requests.Response
+        """
+        return self._do_request("GET", path, raise_for_status, **kwargs)
+
     def _do_post(self, path, raise_for_status=True, **kwargs):
         """Basic POST request client method
 
@@ -39,11 +172,7 @@ class IxVMChassisHTTPClient(object):
         :param dict kwargs: additional kwarg that would be passed to the requests lib
         :rtype: requests.Response
         """
-        url = "{}/{}".format(self._base_url, path)
-        kwargs.update({"verify": self._verify_ssl})
-        resp = requests.post(url=url, headers=self._headers, **kwargs)
-        raise_for_status and resp.raise_for_status()
-        return resp
+        return self._do_request("POST", path, raise_for_status, **kwargs)
 
     def _do_put(self, path, raise_for_status=True, **kwargs):
         """Basic PUT request client method
@@ -52,11 +181,7 @@ class IxVMChassisHTTPClient(object):
         :param dict kwargs: additional kwarg that would be passed to the requests lib
         :rtype: requests.Response
         """
-        url = "{}/{}".format(self._base_url, path)
-        kwargs.update({"verify": self._verify_ssl})
-        resp = requests.put(url=url, headers=self._headers, **kwargs)
-        raise_for_status and resp.raise_for_status()
-        return resp
+        return self._do_request("PUT", path, raise_for_status, **kwargs)
 
     def _do_delete(self, path, raise_for_status=True, **kwargs):
         """Basic DELETE request client method
@@ -65,46 +190,122 @@ class IxVMChassisHTTPClient(object):
         :param dict kwargs: additional kwarg that would be passed to the requests lib
         :rtype: requests.Response
         """
-        url = "{}/{}".format(self._base_url, path)
-        kwargs.update({"verify": self._verify_ssl})
-        resp = requests.delete(url=url, headers=self._headers, **kwargs)
-        raise_for_status and resp.raise_for_status()
-        return resp
+        return self._do_request("DELETE", path, raise_for_status, **kwargs)
 
-    def login(self):
-        """
+    def _create_api_key(self):
+        """Create the new session on the controller
 
-        :return:
+        :return: API key of the created session
+        :rtype: str
         """
         data = {
             "username": self._user,
             "password": self._password,
             "rememberMe": True
         }
-        resp = self._do_post(path="platform/api/v1/auth/session", json=data)
+        resp = self._do_post(path="platform/api/v1/auth/session", reauth=False, json=data)
         resp = resp.json()
-        self._headers.update({"x-api-key": resp["apiKey"]})
+        return resp["apiKey"]
 
-    def get_chassis(self):
-        """"""
-        resp = self._do_get(path="chassis/api/v2/ixos/chassis")
-        resp = resp.json()
+    def _login(self):
+        """Set the cached API key or the new one to the request headers"""
+        api_key = self._api_keys_cache.get_or_login(address=self._address,
+                                                    user=self._user,
+                                                    login=self._create_api_key)
+        self._headers.update({"x-api-key": api_key})
 
-        return resp
+    def login(self):
+        """Log in to the controller, API key of the existing session is reused if possible
 
-    def get_cards(self):
-        """"""
-        resp = self._do_get(path="chassis/api/v2/ixos/cards")
-        resp = resp.json()
+        :return:
+        """
+        self._login()
 
-        return resp
+    def _get_records(self, path, fields=None):
+        """Get list of the IxOS objects
 
-    def get_ports(self):
-        """"""
-        resp = self._do_get(path="chassis/api/v2/ixos/ports")
-        resp = resp.json()
+        :param str path: path for the request
+        :param tuple[str] fields: fields to request and keep in the records, all fields if None
+        :rtype: list[dict]
+        """
+        return list(self._iter_records(path=path, fields=fields))
 
-        return resp
+    def _iter_records(self, path, fields=None):
+        """Iterate over the IxOS objects while the response is still downloading
+
+        Only the given fields are requested from the controller, records are projected on the client side too
+        in case the controller ignores the requested properties
+
+        :param str path: path for the request
+        :param tuple[str] fields: fields to request and keep in the records, all fields if None
+        :rtype: collections.Iterator[dict]
+        """
+        params = {"properties": ",".join(fields)} if fields else None
+        resp = self._do_get(path=path, params=params, stream=True)
+
+        try:
+            for record in iter_json_array(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+                yield project(record, fields)
+        finally:
+            resp.close()
+
+    def get_chassis(self, fields=CHASSIS_FIELDS):
+        """
+
+        :param tuple[str] fields: chassis fields to get, all fields if None
+        :rtype: list[dict]
+        """
+        return self._get_records(path="chassis/api/v2/ixos/chassis", fields=fields)
+
+    def get_cards(self, fields=CARD_FIELDS):
+        """
+
+        :param tuple[str] fields: card fields to get, all fields if None
+        :rtype: list[dict]
+        """
+        return self._get_records(path="chassis/api/v2/ixos/cards", fields=fields)
+
+    def get_ports(self, fields=PORT_FIELDS):
+        """
+
+        :param tuple[str] fields: port fields to get, all fields if None
+        :rtype: list[dict]
+        """
+        return self._get_records(path="chassis/api/v2/ixos/ports", fields=fields)
+
+    def _count_records(self, path):
+        """Count IxOS objects, only their IDs are downloaded
+
+        :param str path: path for the request
+        :rtype: int
+        """
+        return sum(1 for _ in self._iter_records(path=path, fields=COUNT_FIELDS))
+
+    def get_structure_counts(self):
+        """Cheap chassis structure probe, IxOS REST API has no count requests so only IDs are fetched
+
+        :rtype: StructureCounts
+        """
+        cards = self._count_records(path="chassis/api/v2/ixos/cards")
+        # ports can't appear before the cards
+        ports = self._count_records(path="chassis/api/v2/ixos/ports") if cards else 0
+
+        return StructureCounts(cards=cards, ports=ports)
+
+    def get_inventory_snapshot(self):
+        """Fetch chassis, cards and ports data concurrently
+
+        :rtype: InventorySnapshot
+        """
+        requests_pool = ThreadPool(processes=len(InventorySnapshot._fields))
+
+        try:
+            chassis, cards, ports = requests_pool.map(lambda fetch: fetch(),
+                                                      (self.get_chassis, self.get_cards, self.get_ports))
+        finally:
+            requests_pool.terminate()
+
+        return InventorySnapshot(chassis=chassis, cards=cards, ports=ports)
 
     def check_if_service_is_deployed(self, logger):
         """
@@ -112,9 +313,10 @@ class IxVMChassisHTTPClient(object):
         """
         ""
         try:
-            resp = self._do_get(path="chassis/api/v2/ixos/chassis", raise_for_status=False)
-        except requests.exceptions.ConnectionError:
+            resp = self._do_get(path="chassis/api/v2/ixos/chassis", raise_for_status=False, reauth=False)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             return False
 
-        return resp.status_code == httplib.UNAUTHORIZED
+        # request is authorized if the client already reuses a cached API key
+        return resp.status_code in (httplib.UNAUTHORIZED, httplib.OK)
 
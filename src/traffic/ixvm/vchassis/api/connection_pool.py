@@ -0,0 +1,49 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_POOL_CONNECTIONS = 50  # amount of the per-host pools (chassis) kept alive
+DEFAULT_POOL_MAXSIZE = 4  # max amount of the keep-alive connections to the one chassis
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _create_session(pool_connections, pool_maxsize):
+    """Create requests session with the keep-alive connection pool
+
+    :param int pool_connections: amount of the per-host connection pools to cache
+    :param int pool_maxsize: max amount of the connections to the one host
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    # block when all connections to the host are busy instead of opening the new ones
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+
+    for scheme in ("http://", "https://"):
+        session.mount(scheme, adapter)
+
+    return session
+
+
+def get_session(pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_connections=DEFAULT_POOL_CONNECTIONS):
+    """Get the process-wide session shared between driver commands and threads
+
+    Sessions are cached by the pool settings, so all clients with the same settings
+    reuse the same TCP/TLS connections to the chassis
+
+    :param int pool_maxsize: max amount of the connections to the one host
+    :param int pool_connections: amount of the per-host connection pools to cache
+    :rtype: requests.Session
+    """
+    key = (pool_connections, pool_maxsize)
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+
+        if session is None:
+            session = _sessions[key] = _create_session(pool_connections=pool_connections,
+                                                       pool_maxsize=pool_maxsize)
+    return session
@@ -0,0 +1,94 @@
+import codecs
+import json
+import re
+
+
+_WHITESPACE_RE = re.compile(r"[ \t\r\n]*")
+_ITEM_TERMINATORS = u" \t\r\n,]"
+
+# what the decoder expects next
+_ARRAY_START, _ITEM_OR_ARRAY_END, _ITEM, _SEPARATOR_OR_ARRAY_END, _NOTHING = range(5)
+
+
+def iter_json_array(chunks, encoding="utf-8"):
+    """Decode JSON array incrementally, yielding its items as soon as they are received
+
+    :param collections.Iterable[bytes] chunks: raw chunks of the JSON document
+    :param str encoding: document encoding
+    :raises ValueError: if the document isn't a valid JSON array
+    :rtype: collections.Iterator
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    buf = u""
+    pos = 0
+    expected = _ARRAY_START
+
+    for chunk in chunks:
+        buf = buf[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+        while True:
+            pos = _WHITESPACE_RE.match(buf, pos).end()
+
+            if pos >= len(buf):
+                break
+
+            char = buf[pos]
+
+            if expected == _NOTHING:
+                raise ValueError("Unexpected data after the JSON array: '{}'".format(buf[pos:pos + 20]))
+
+            if expected == _ARRAY_START:
+                if char != u"[":
+                    raise ValueError("JSON array expected, got '{}'".format(buf[pos:pos + 20]))
+                expected = _ITEM_OR_ARRAY_END
+                pos += 1
+                continue
+
+            if expected == _SEPARATOR_OR_ARRAY_END:
+                if char not in u",]":
+                    raise ValueError("',' or ']' expected after the JSON array item, got '{}'"
+                                     .format(buf[pos:pos + 20]))
+                expected = _ITEM if char == u"," else _NOTHING
+                pos += 1
+                continue
+
+            if char == u"]" and expected == _ITEM_OR_ARRAY_END:
+                expected = _NOTHING
+                pos += 1
+                continue
+
+            if char in u",]":
+                raise ValueError("JSON array item expected, got '{}'".format(buf[pos:pos + 20]))
+
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # item isn't received completely yet
+                break
+
+            if end == len(buf) or buf[end] not in _ITEM_TERMINATORS:
+                # number can be split by the chunk boundary, e.g. "[12" "34]" or "[1." "5]",
+                # the item is complete only when the separator or the array end follows it
+                break
+
+            pos = end
+            expected = _SEPARATOR_OR_ARRAY_END
+            yield item
+
+    if expected != _NOTHING:
+        raise ValueError("Unexpected end of the JSON array")
+
+
+def project(record, fields):
+    """Leave only the given fields of the record
+
+    :param dict record:
+    :param tuple[str] fields: fields to keep, all fields are kept if None
+    :rtype: dict
+    """
+    if fields is None:
+        return record
+
+    return {field: record.get(field) for field in fields}
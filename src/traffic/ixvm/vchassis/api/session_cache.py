@@ -0,0 +1,66 @@
+import threading
+
+
+class ApiKeyCache(object):
+    def __init__(self):
+        """Thread-safe cache of the controller API keys by the controller address and user"""
+        self._api_keys = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _get_lock(self, key):
+        """Get lock for the given cache key
+
+        :param tuple key:
+        :rtype: threading.Lock
+        """
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, address, user):
+        """Get cached API key
+
+        :param str address: controller address
+        :param str user: controller username
+        :rtype: str
+        """
+        return self._api_keys.get((address, user))
+
+    def get_or_login(self, address, user, login):
+        """Get cached API key or log in to get the new one
+
+        Only one thread performs the login for the same address and user, others reuse its API key
+
+        :param str address: controller address
+        :param str user: controller username
+        :param function login: function that logs in and returns the new API key
+        :rtype: str
+        """
+        key = (address, user)
+
+        with self._get_lock(key):
+            api_key = self._api_keys.get(key)
+
+            if api_key is None:
+                api_key = self._api_keys[key] = login()
+
+            return api_key
+
+    def invalidate(self, address, user, api_key):
+        """Remove cached API key rejected by the controller
+
+        The key is removed only if it's still cached, so the new key already received by the other thread
+        after the same rejection is kept
+
+        :param str address: controller address
+        :param str user: controller username
+        :param str api_key: rejected API key
+        """
+        key = (address, user)
+
+        with self._get_lock(key):
+            if self._api_keys.get(key) == api_key:
+                del self._api_keys[key]
+
+
+api_key_cache = ApiKeyCache()
@@ -0,0 +1,80 @@
+from operator import attrgetter
+
+
+class PortRecord(object):
+    __slots__ = ("id", "parent_id", "number")
+
+    def __init__(self, id, parent_id, number):
+        """
+
+        :param id: port id
+        :param parent_id: id of the port card
+        :param int number: port number on the card
+        """
+        self.id = id
+        self.parent_id = parent_id
+        self.number = number
+
+
+class CardRecord(object):
+    __slots__ = ("id", "number", "ports")
+
+    def __init__(self, id, number):
+        """
+
+        :param id: card id
+        :param int number: card number on the chassis
+        """
+        self.id = id
+        self.number = number
+        self.ports = []
+
+
+class InventoryIndex(object):
+    __slots__ = ("cards", "orphan_ports")
+
+    def __init__(self, cards, orphan_ports=()):
+        """Chassis cards with their ports sorted by the port number
+
+        :param list[CardRecord] cards:
+        :param list[PortRecord] orphan_ports: ports with unknown parent card
+        """
+        self.cards = cards
+        self.orphan_ports = list(orphan_ports)
+
+    @classmethod
+    def build(cls, cards_data, ports_data):
+        """Build index from the IxOS cards and ports data in one pass over the ports
+
+        :param list[dict] cards_data: IxOS cards data
+        :param collections.Iterable[dict] ports_data: IxOS ports data
+        :rtype: InventoryIndex
+        """
+        cards = [CardRecord(id=card_data["id"], number=card_data["cardNumber"]) for card_data in cards_data]
+        cards_by_id = {card.id: card for card in cards}
+        orphan_ports = []
+
+        for port_data in ports_data:
+            port = PortRecord(id=port_data["id"],
+                              parent_id=port_data["parentId"],
+                              number=int(port_data["portNumber"]))
+            card = cards_by_id.get(port.parent_id)
+
+            if card is None:
+                orphan_ports.append(port)
+            else:
+                card.ports.append(port)
+
+        sort_key = attrgetter("number")
+        for card in cards:
+            card.ports.sort(key=sort_key)
+
+        return cls(cards=cards, orphan_ports=orphan_ports)
+
+    @property
+    def ports_count(self):
+        """
+
+        :rtype: int
+        """
+        return sum(len(card.ports) for card in self.cards)
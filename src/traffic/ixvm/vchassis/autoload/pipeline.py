@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import OrderedDict
+
+from traffic.ixvm.vchassis.deadline import Deadline
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbeCancelled
+
+
+class PipelineStageSkipped(Exception):
+    pass
+
+
+class AutoloadProgress(object):
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+    def __init__(self):
+        """Thread-safe status and duration of the each autoload phase"""
+        self._lock = threading.Lock()
+        self._phases = OrderedDict()
+
+    def set_status(self, phase, status):
+        """
+
+        :param str phase: phase name
+        :param str status: phase status
+        """
+        with self._lock:
+            phase_info = self._phases.setdefault(phase, {"status": self.PENDING, "start_time": None, "elapsed": 0})
+            phase_info["status"] = status
+
+            if status == self.RUNNING:
+                phase_info["start_time"] = time.time()
+            elif phase_info["start_time"] is not None:
+                phase_info["elapsed"] = time.time() - phase_info["start_time"]
+
+    def to_dict(self):
+        """
+
+        :return: status and duration in seconds of the phases by their names
+        :rtype: dict
+        """
+        now = time.time()
+
+        with self._lock:
+            return OrderedDict((name, OrderedDict((
+                ("status", info["status"]),
+                ("elapsed", round(now - info["start_time"] if info["status"] == self.RUNNING else info["elapsed"],
+                                  3)))))
+                for name, info in self._phases.iteritems())
+
+
+class PipelineStage(object):
+    def __init__(self, name, func, depends_on=()):
+        """
+
+        :param str name: stage name
+        :param function func: stage function, its result is stored in the pipeline results
+        :param tuple[str] depends_on: names of the stages that must finish before this one starts
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.finished = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class AutoloadPipeline(object):
+    def __init__(self, logger, metrics=None, deadline=None, progress=None):
+        """Run autoload stages as soon as their dependencies are finished
+
+        Independent stages are executed concurrently, each one in its own thread
+
+        :param logging.Logger logger:
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics: metrics to record the stages durations
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline: deadline of the whole command, the stage
+            that ran out of it is named in the error
+        :param AutoloadProgress progress: progress to report the stages statuses to
+        """
+        self._logger = logger
+        self._metrics = metrics or CommandMetrics()
+        self._deadline = deadline or Deadline()
+        self._progress = progress or AutoloadProgress()
+        self._stages = OrderedDict()
+        self._failed_stages = []
+        self._failed_stages_lock = threading.Lock()
+        self.cancel_event = threading.Event()
+
+    def add_stage(self, name, func, depends_on=()):
+        """
+
+        :param str name: stage name
+        :param function func: stage function
+        :param tuple[str] depends_on: names of the previously added stages this one depends on
+        """
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError("Stage '{}' depends on unknown stage '{}'".format(name, dependency))
+
+        self._stages[name] = PipelineStage(name=name, func=func, depends_on=depends_on)
+        self._progress.set_status(name, AutoloadProgress.PENDING)
+
+    def get_result(self, name):
+        """Get result of the finished stage, should be called from the stages that depend on it
+
+        :param str name: stage name
+        """
+        return self._stages[name].result
+
+    def _fail_stage(self, stage, error):
+        """Record the stage failure in the order the failures happen and cancel the rest of the stages
+
+        :param PipelineStage stage:
+        :param Exception error:
+        """
+        stage.error = error
+        self._progress.set_status(stage.name, AutoloadProgress.FAILED)
+        self._logger.exception("Autoload stage '{}' failed:".format(stage.name))
+
+        with self._failed_stages_lock:
+            self._failed_stages.append(stage)
+
+        # stop the stages that are still waiting for something
+        self.cancel_event.set()
+
+    def _run_stage(self, stage):
+        """
+
+        :param PipelineStage stage:
+        """
+        try:
+            for dependency in stage.depends_on:
+                dependency = self._stages[dependency]
+                dependency.finished.wait()
+
+                if dependency.error is not None:
+                    raise PipelineStageSkipped("Stage '{}' failed".format(dependency.name))
+
+            if self.cancel_event.is_set():
+                raise PipelineStageSkipped("Pipeline was cancelled")
+
+            self._logger.info("Autoload stage '{}' started".format(stage.name))
+            self._progress.set_status(stage.name, AutoloadProgress.RUNNING)
+            with self._metrics.phase(stage.name), self._deadline.phase(stage.name):
+                stage.result = stage.func()
+            self._progress.set_status(stage.name, AutoloadProgress.FINISHED)
+            self._logger.info("Autoload stage '{}' finished".format(stage.name))
+
+        except ReadinessProbeCancelled as e:
+            if self.cancel_event.is_set():
+                # probe was interrupted by the failure of another stage, which is the root cause
+                stage.error = e
+                self._progress.set_status(stage.name, AutoloadProgress.SKIPPED)
+                self._logger.info("Autoload stage '{}' cancelled: {}".format(stage.name, e))
+            else:
+                self._fail_stage(stage, e)
+
+        except PipelineStageSkipped as e:
+            stage.error = e
+            self._progress.set_status(stage.name, AutoloadProgress.SKIPPED)
+            self._logger.info("Autoload stage '{}' skipped: {}".format(stage.name, e))
+
+        except Exception as e:
+            self._fail_stage(stage, e)
+
+        finally:
+            stage.finished.set()
+
+    def run(self):
+        """Run all stages and wait for them
+
+        :raises Exception: error of the stage that failed first, the stages cancelled because of it are skipped
+        :return: results of the stages by their names
+        :rtype: dict[str, object]
+        """
+        threads = []
+        for stage in self._stages.itervalues():
+            thread = threading.Thread(target=self._run_stage, args=(stage,), name="autoload-{}".format(stage.name))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        if self._failed_stages:
+            raise self._failed_stages[0].error
+
+        return {stage.name: stage.result for stage in self._stages.itervalues()}
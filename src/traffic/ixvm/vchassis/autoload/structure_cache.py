@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from collections import namedtuple
+
+
+StructureDiff = namedtuple("StructureDiff", ["added_modules", "removed_modules", "added_ports", "removed_ports"])
+
+
+class ChassisStructure(namedtuple("ChassisStructure", ["chassis_id", "modules", "ports"])):
+    """Chassis structure identity: chassis id, (id, card number) of the modules and
+    (id, parent id, port number) of the ports"""
+    __slots__ = ()
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+
+        :param traffic.ixvm.vchassis.api.client.InventorySnapshot snapshot:
+        :rtype: ChassisStructure
+        """
+        return cls(chassis_id=snapshot.chassis[0]["id"],
+                   modules=frozenset((card["id"], card["cardNumber"]) for card in snapshot.cards),
+                   ports=frozenset((port["id"], port["parentId"], port["portNumber"]) for port in snapshot.ports))
+
+    @property
+    def fingerprint(self):
+        """
+
+        :rtype: str
+        """
+        data = repr((self.chassis_id, sorted(self.modules), sorted(self.ports)))
+        return hashlib.sha1(data).hexdigest()
+
+    def diff(self, other):
+        """Get modules and ports added and removed comparing to the other structure
+
+        :param ChassisStructure other: previous structure
+        :rtype: StructureDiff
+        """
+        return StructureDiff(added_modules=sorted(self.modules - other.modules),
+                             removed_modules=sorted(other.modules - self.modules),
+                             added_ports=sorted(self.ports - other.ports),
+                             removed_ports=sorted(other.ports - self.ports))
+
+
+class AutoloadDetailsCache(object):
+    def __init__(self):
+        """Thread-safe cache of the last autoload result per resource"""
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get_structure(self, resource_name):
+        """Get the structure of the last autoload of the resource
+
+        :param str resource_name:
+        :rtype: ChassisStructure
+        """
+        with self._lock:
+            structure, _ = self._cache.get(resource_name, (None, None))
+            return structure
+
+    def get(self, resource_name, structure):
+        """Get cached autoload details if the resource structure wasn't changed
+
+        :param str resource_name:
+        :param ChassisStructure structure: current chassis structure
+        :rtype: cloudshell.shell.core.driver_context.AutoLoadDetails
+        """
+        with self._lock:
+            cached_structure, details = self._cache.get(resource_name, (None, None))
+
+        if cached_structure is not None and cached_structure.fingerprint == structure.fingerprint:
+            return details
+
+    def get_last(self, resource_name):
+        """Get autoload details of the last autoload of the resource whatever the current structure is
+
+        :param str resource_name:
+        :rtype: cloudshell.shell.core.driver_context.AutoLoadDetails
+        """
+        with self._lock:
+            _, details = self._cache.get(resource_name, (None, None))
+            return details
+
+    def set(self, resource_name, structure, details):
+        """
+
+        :param str resource_name:
+        :param ChassisStructure structure:
+        :param cloudshell.shell.core.driver_context.AutoLoadDetails details:
+        """
+        with self._lock:
+            self._cache[resource_name] = (structure, details)
+
+    def invalidate(self, resource_name):
+        """Remove autoload details of the resource which structure was changed
+
+        :param str resource_name:
+        """
+        with self._lock:
+            self._cache.pop(resource_name, None)
+
+
+autoload_details_cache = AutoloadDetailsCache()
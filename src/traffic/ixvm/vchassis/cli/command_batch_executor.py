@@ -0,0 +1,59 @@
+from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+
+from traffic.ixvm.vchassis.deadline import Deadline
+from traffic.ixvm.vchassis.deadline import DeadlineExceeded
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+
+
+class CommandBatchExecutor(object):
+    def __init__(self, cli_service, metrics=None, deadline=None):
+        """Execute several command templates one by one in the same CLI session
+
+        :param cloudshell.cli.cli_service_impl.CliServiceImpl cli_service:
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline: deadline of the whole driver command,
+            read timeout of the each CLI command is taken from its remaining budget
+        """
+        self._cli_service = cli_service
+        self._metrics = metrics or CommandMetrics()
+        self._deadline = deadline or Deadline()
+        self._commands = []
+
+    def add_command(self, command_template, drops_session=False, **command_kwargs):
+        """Add command to the batch
+
+        :param cloudshell.cli.command_template.command_template.CommandTemplate command_template:
+        :param bool drops_session: whether command breaks the session (e.g. restarts the service it is served by)
+        :param dict command_kwargs: command template arguments
+        """
+        self._commands.append((command_template, drops_session, command_kwargs))
+
+    def execute(self):
+        """Execute all commands in the batch
+
+        Session is marked as inactive after the command that drops it, so it isn't returned to the pool.
+        Such command should be the last one in the batch
+
+        :return: outputs of the commands
+        :raises traffic.ixvm.vchassis.deadline.DeadlineExceeded: if the command deadline is exceeded
+        :rtype: list[str]
+        """
+        outputs = []
+
+        for command_template, drops_session, command_kwargs in self._commands:
+            command = CommandTemplateExecutor(cli_service=self._cli_service,
+                                              command_template=command_template,
+                                              timeout=self._deadline.cli_timeout())
+
+            try:
+                with self._metrics.measure("cli", command_template.prepare_command(**command_kwargs)):
+                    outputs.append(command.execute_command(**command_kwargs))
+            except Exception:
+                if self._deadline.expired:
+                    raise DeadlineExceeded(budget=self._deadline.budget)
+                raise
+
+            if drops_session:
+                self._cli_service.session.set_active(False)
+
+        return outputs
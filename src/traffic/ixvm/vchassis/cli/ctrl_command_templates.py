@@ -19,6 +19,8 @@ def prepare_error_map(error_map=None):
     return error_map
 
 
+SHOW_LICENSE_SERVER = CommandTemplate("show license-server", error_map=prepare_error_map())
+
 CONFIGURE_LICENSE_SERVER = CommandTemplate("set license-server {license_server_ip}", error_map=prepare_error_map())
 
 RESTART_IXVM_SERVICE = CommandTemplate("restart-service ixServer", error_map=prepare_error_map())
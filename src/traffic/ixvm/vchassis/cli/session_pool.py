@@ -0,0 +1,76 @@
+import threading
+from Queue import Empty
+
+from cloudshell.cli.cli import CLI
+from cloudshell.cli.session_manager_impl import SessionManagerImpl
+from cloudshell.cli.session_pool_manager import SessionPoolManager
+
+
+_resource_clis = {}
+_resource_clis_lock = threading.Lock()
+
+
+class ResourceSessionPool(SessionPoolManager):
+    def __init__(self, max_pool_size):
+        """Sessions pool of the one resource
+
+        Default session manager of SessionPoolManager is shared by all pools of the process, so the sessions
+        of all resources would be counted against the each resource limit. Every resource pool has its own one
+
+        :param int max_pool_size: max amount of the sessions to the resource
+        """
+        super(ResourceSessionPool, self).__init__(session_manager=SessionManagerImpl(), max_pool_size=max_pool_size)
+
+    def close(self, logger):
+        """Disconnect sessions that are idle in the pool
+
+        Sessions used by the running commands are returned to the pool and released with it
+
+        :param logging.Logger logger:
+        """
+        while True:
+            try:
+                session = self._pool.get(False)
+            except Empty:
+                return
+
+            try:
+                session.disconnect()
+            except Exception:
+                logger.debug("Failed to disconnect {} session".format(session.session_type), exc_info=True)
+
+            self.remove_session(session, logger)
+
+
+def get_resource_cli(resource_name, sessions_concurrency_limit):
+    """Get CLI object shared by all commands of the resource
+
+    CLI keeps authenticated sessions in its pool, so the sessions stay alive between the driver commands
+    and driver instances of the same resource
+
+    :param str resource_name: resource full name
+    :param int sessions_concurrency_limit: max amount of the sessions to the resource
+    :rtype: cloudshell.cli.cli.CLI
+    """
+    key = (resource_name, int(sessions_concurrency_limit))
+
+    with _resource_clis_lock:
+        if key not in _resource_clis:
+            session_pool = ResourceSessionPool(max_pool_size=int(sessions_concurrency_limit))
+            _resource_clis[key] = (CLI(session_pool=session_pool), session_pool)
+
+        cli, _ = _resource_clis[key]
+        return cli
+
+
+def drop_resource_cli(resource_name, logger):
+    """Forget CLI objects of the resource and disconnect their idle sessions
+
+    :param str resource_name: resource full name
+    :param logging.Logger logger:
+    """
+    with _resource_clis_lock:
+        session_pools = [_resource_clis.pop(key)[1] for key in _resource_clis.keys() if key[0] == resource_name]
+
+    for session_pool in session_pools:
+        session_pool.close(logger)
@@ -0,0 +1,93 @@
+from cloudshell.devices.standards.traffic.virtual.chassis.configuration_attributes_structure import \
+    TrafficGeneratorVChassisResource
+
+from traffic.ixvm.vchassis.probes import readiness
+
+
+DEFAULT_SERVICE_STARTING_TIMEOUT = 60 * 60
+DEFAULT_AUTOLOAD_TIMEOUT = 70 * 60
+
+
+class IxVMVChassisResource(TrafficGeneratorVChassisResource):
+    def _get_number_attribute(self, name, default, attr_type=int):
+        """Get numeric attribute value, returns default one if the attribute is missing or empty
+
+        :param str name: attribute name without the namespace
+        :param default: default value
+        :param type attr_type: type of the attribute value (int|float)
+        """
+        value = self.attributes.get("{}{}".format(self.namespace_prefix, name))
+
+        if value in (None, ""):
+            return default
+
+        return attr_type(value)
+
+    def _get_bool_attribute(self, name):
+        """Get boolean attribute value, False if the attribute is missing
+
+        :param str name: attribute name without the namespace
+        :rtype: bool
+        """
+        value = self.attributes.get("{}{}".format(self.namespace_prefix, name)) or ""
+        return value.lower() == "true"
+
+    @property
+    def service_starting_timeout(self):
+        """
+
+        :rtype: int
+        """
+        return self._get_number_attribute("Service Starting Timeout", DEFAULT_SERVICE_STARTING_TIMEOUT)
+
+    @property
+    def autoload_timeout(self):
+        """Max time in seconds for the whole Autoload command
+
+        :rtype: int
+        """
+        return self._get_number_attribute("Autoload Timeout", DEFAULT_AUTOLOAD_TIMEOUT)
+
+    @property
+    def profiling_enabled(self):
+        """Whether the driver commands run under the profiler
+
+        :rtype: bool
+        """
+        return self._get_bool_attribute("Enable Profiling")
+
+    @property
+    def background_autoload(self):
+        """Whether the Autoload runs as the background job and the command returns immediately
+
+        :rtype: bool
+        """
+        return self._get_bool_attribute("Background Autoload")
+
+    @property
+    def inventory_prefetch(self):
+        """Whether the driver initialization starts fetching the inventory of the not yet discovered resource
+
+        :rtype: bool
+        """
+        return self._get_bool_attribute("Inventory Prefetch")
+
+    @property
+    def service_poll_min_interval(self):
+        """
+
+        :rtype: float
+        """
+        return self._get_number_attribute("Service Poll Min Interval",
+                                          readiness.DEFAULT_MIN_POLL_INTERVAL,
+                                          attr_type=float)
+
+    @property
+    def service_poll_max_interval(self):
+        """
+
+        :rtype: float
+        """
+        return self._get_number_attribute("Service Poll Max Interval",
+                                          readiness.DEFAULT_MAX_POLL_INTERVAL,
+                                          attr_type=float)
@@ -0,0 +1,24 @@
+def call_cs_api(cs_api, metrics, method_name, *args, **kwargs):
+    """Call CloudShell API method and record its latency
+
+    :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_api:
+    :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics: metrics of the command the API is called in
+    :param str method_name: CloudShell API method name
+    """
+    with metrics.measure("cloudshell_api", method_name):
+        return getattr(cs_api, method_name)(*args, **kwargs)
+
+
+def iter_resource_ports(resources, port_model):
+    """Iterate over the ports of the resources tree
+
+    :param list[cloudshell.api.cloudshell_api.ResourceInfo] resources:
+    :param str port_model: port model name
+    :rtype: collections.Iterator[cloudshell.api.cloudshell_api.ResourceInfo]
+    """
+    for resource in resources:
+        if resource.ResourceModelName == port_model:
+            yield resource
+        else:
+            for port in iter_resource_ports(resource.ChildResources, port_model):
+                yield port
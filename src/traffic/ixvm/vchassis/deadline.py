@@ -0,0 +1,114 @@
+import time
+from contextlib import contextmanager
+
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 120
+DEFAULT_CLI_TIMEOUT = 30
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, budget, phase=None):
+        """
+
+        :param float budget: whole command budget in seconds
+        :param str phase: name of the phase that ran out of the budget
+        """
+        super(DeadlineExceeded, self).__init__(budget, phase)
+        self.budget = budget
+        self.phase = phase
+
+    def __str__(self):
+        return "Command didn't finish within {} second(s), deadline exceeded during the '{}' phase".format(
+            self.budget, self.phase or "unknown")
+
+
+class Deadline(object):
+    def __init__(self, budget=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 cli_timeout=DEFAULT_CLI_TIMEOUT):
+        """Time budget of the whole command shared by all its requests, polls and CLI commands
+
+        :param float budget: budget in seconds, unlimited if None
+        :param float connect_timeout: max connect timeout in seconds of the one request
+        :param float read_timeout: max read timeout in seconds of the one request
+        :param float cli_timeout: max read timeout in seconds of the one CLI command
+        """
+        self._budget = budget
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._cli_timeout = cli_timeout
+        self._expires_at = float("inf") if budget is None else time.time() + budget
+
+    @property
+    def budget(self):
+        """
+
+        :rtype: float
+        """
+        return self._budget
+
+    @property
+    def remaining(self):
+        """Remaining time in seconds, inf for the unlimited budget
+
+        :rtype: float
+        """
+        return max(0, self._expires_at - time.time())
+
+    @property
+    def expired(self):
+        """
+
+        :rtype: bool
+        """
+        return self.remaining <= 0
+
+    def check(self):
+        """
+
+        :raises DeadlineExceeded: if there is no time left
+        """
+        if self.expired:
+            raise DeadlineExceeded(budget=self._budget)
+
+    def timeout(self, max_timeout):
+        """Get timeout for the next operation limited by the remaining budget
+
+        :param float max_timeout: timeout in seconds the operation would use without the deadline
+        :raises DeadlineExceeded: if there is no time left
+        :rtype: float
+        """
+        self.check()
+        return min(max_timeout, self.remaining)
+
+    def request_timeout(self):
+        """Get connect and read timeouts for the next HTTP request
+
+        :raises DeadlineExceeded: if there is no time left
+        :rtype: tuple[float, float]
+        """
+        return self.timeout(self._connect_timeout), self.timeout(self._read_timeout)
+
+    def cli_timeout(self):
+        """Get read timeout for the next CLI command
+
+        :raises DeadlineExceeded: if there is no time left
+        :rtype: float
+        """
+        return self.timeout(self._cli_timeout)
+
+    @contextmanager
+    def phase(self, name):
+        """Name the phase in the DeadlineExceeded errors raised within it
+
+        Works across the threads: the error raised by the helper thread gets the phase
+        of the code that re-raised it
+
+        :param str name: phase name
+        """
+        try:
+            yield
+        except DeadlineExceeded as e:
+            if e.phase is None:
+                e.phase = name
+            raise
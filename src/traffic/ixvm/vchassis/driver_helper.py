@@ -0,0 +1,51 @@
+import threading
+
+from cloudshell.core.logger.qs_logger import get_qs_logger
+from cloudshell.shell.core.session.logging_session import INVENTORY
+from cloudshell.shell.core.session.logging_session import LoggingSessionContext
+
+
+def _get_thread_logger(logger):
+    """Create child of the QS Logger with the current thread name
+
+    :param logging.Logger logger:
+    :rtype: logging.Logger
+    """
+    child = logger.getChild(threading.currentThread().name)
+    for handler in logger.handlers:
+        child.addHandler(handler)
+    child.level = logger.level
+    for log_filter in logger.filters:
+        child.addFilter(log_filter)
+    return child
+
+
+def get_logger_with_thread_id(context):
+    """Create QS Logger for the command context with the thread name
+
+    Lightweight version of the cloudshell.devices.driver_helper function, which imports CLI and SNMP packages
+
+    :param context: command context
+    :rtype: logging.Logger
+    """
+    return _get_thread_logger(LoggingSessionContext.get_logger_for_context(context))
+
+
+def get_inventory_logger(resource_name):
+    """Create QS Logger of the inventory log group for the work outside the command context, e.g. initialization
+
+    :param str resource_name: resource name, prefix of the log file
+    :rtype: logging.Logger
+    """
+    return _get_thread_logger(get_qs_logger(log_group=INVENTORY, log_category="QS", log_file_prefix=resource_name))
+
+
+def get_api(context):
+    """Create CloudShell API session, API package is imported only when it is needed
+
+    :param context: command context
+    :rtype: cloudshell.api.cloudshell_api.CloudShellAPISession
+    """
+    from cloudshell.shell.core.session.cloudshell_session import CloudShellSessionContext
+
+    return CloudShellSessionContext(context).get_api()
@@ -1,34 +1,71 @@
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+import re
+
+from cloudshell.cli.session.session_exceptions import CommandExecutionException
 
 from traffic.ixvm.vchassis.cli import ctrl_command_templates
+from traffic.ixvm.vchassis.cli.command_batch_executor import CommandBatchExecutor
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+
 
+LICENSE_SERVER_RE = re.compile(r"^\s*license[\s_-]*server(?:\s+(?:ip|address))?\s*[:=]\s*(?P<address>\S+)\s*$",
+                               re.IGNORECASE | re.MULTILINE)
 
 class IxVMConfigureLicenseServerFlow(object):
-    def __init__(self, cli_handler, resource_config, cs_api, logger):
+    def __init__(self, cli_handler, resource_config, cs_api, logger, metrics=None, deadline=None):
         """
 
         :param traffic.teravm.controller.cli.ctrl_handler.IxVMControllerCliHandler cli_handler:
         :param traffic.teravm.controller.configuration_attributes_structure.TrafficGeneratorControllerResource resource_config:
         :param logging.Logger logger:
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline:
         """
         self._cli_handler = cli_handler
         self._resource_config = resource_config
         self._cs_api = cs_api
         self._logger = logger
+        self._metrics = metrics or CommandMetrics()
+        self._deadline = deadline
+
+    def _get_current_license_server(self, cli_session):
+        """Get license server configured on the chassis
+
+        :param cli_session:
+        :return: license server address or None if it can't be determined
+        :rtype: str
+        """
+        batch = CommandBatchExecutor(cli_service=cli_session, metrics=self._metrics, deadline=self._deadline)
+        batch.add_command(ctrl_command_templates.SHOW_LICENSE_SERVER)
+
+        try:
+            output = batch.execute()[0]
+        except CommandExecutionException:
+            self._logger.warning("Unable to get current license server from the chassis", exc_info=True)
+            return
+
+        match = LICENSE_SERVER_RE.search(output)
+
+        if match:
+            return match.group("address")
 
     def execute_flow(self, license_server_ip):
         """
 
         :param str license_server_ip:
-        :return:
+        :return: whether license server was changed and IxVM service was restarted
+        :rtype: bool
         """
         with self._cli_handler.get_cli_service(self._cli_handler.cli_mode) as cli_session:
-            command = CommandTemplateExecutor(cli_service=cli_session,
-                                              command_template=ctrl_command_templates.CONFIGURE_LICENSE_SERVER)
+            current_license_server = self._get_current_license_server(cli_session)
 
-            command.execute_command(license_server_ip=license_server_ip)
+            if current_license_server is not None and current_license_server == license_server_ip:
+                self._logger.info("License server {} is already configured, skip IxVM service restart"
+                                  .format(license_server_ip))
+                return False
 
-            command = CommandTemplateExecutor(cli_service=cli_session,
-                                              command_template=ctrl_command_templates.RESTART_IXVM_SERVICE)
+            batch = CommandBatchExecutor(cli_service=cli_session, metrics=self._metrics, deadline=self._deadline)
+            batch.add_command(ctrl_command_templates.CONFIGURE_LICENSE_SERVER, license_server_ip=license_server_ip)
+            batch.add_command(ctrl_command_templates.RESTART_IXVM_SERVICE, drops_session=True)
+            batch.execute()
 
-            command.execute_command()
+            return True
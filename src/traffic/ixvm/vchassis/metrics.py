@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+_hooks = []
+_hooks_lock = threading.Lock()
+
+
+def register_metrics_hook(hook):
+    """Register function that receives metrics summary of the each finished command
+
+    :param function hook: function that accepts metrics summary dict
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def unregister_metrics_hook(hook):
+    """
+
+    :param function hook:
+    """
+    with _hooks_lock:
+        _hooks.remove(hook)
+
+
+class OperationStats(object):
+    __slots__ = ("count", "errors", "bytes", "total_latency", "max_latency")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def to_dict(self):
+        """
+
+        :rtype: dict
+        """
+        return OrderedDict((("count", self.count),
+                            ("errors", self.errors),
+                            ("bytes", self.bytes),
+                            ("avg_latency", round(self.total_latency / self.count, 3) if self.count else 0),
+                            ("max_latency", round(self.max_latency, 3))))
+
+
+class CommandMetrics(object):
+    def __init__(self, command=None, resource_name=None):
+        """Phase timings, counters and per-operation stats of the one driver command
+
+        :param str command: command name
+        :param str resource_name: resource name
+        """
+        self.command = command
+        self.resource_name = resource_name
+        self._start_time = time.time()
+        self._lock = threading.Lock()
+        self._phases = OrderedDict()
+        self._counters = OrderedDict()
+        self._operations = OrderedDict()
+
+    @contextmanager
+    def phase(self, name):
+        """Measure duration of the named command phase
+
+        :param str name: phase name
+        """
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0) + time.time() - start_time
+
+    def increment(self, counter, value=1):
+        """
+
+        :param str counter: counter name
+        :param int value:
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def record(self, category, name, latency, bytes=0, error=False):
+        """Record one operation (HTTP request, CLI command, etc.)
+
+        :param str category: operation category, e.g. "http" or "cli"
+        :param str name: operation name, e.g. endpoint or command
+        :param float latency: operation duration in seconds
+        :param int bytes: transferred bytes
+        :param bool error: whether operation failed
+        """
+        with self._lock:
+            stats = self._operations.setdefault(category, OrderedDict()).get(name)
+
+            if stats is None:
+                stats = self._operations[category][name] = OperationStats()
+
+            stats.count += 1
+            stats.errors += int(error)
+            stats.bytes += bytes
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+
+    @contextmanager
+    def measure(self, category, name):
+        """Measure one operation, it is recorded as failed if an exception is raised
+
+        :param str category: operation category
+        :param str name: operation name
+        """
+        start_time = time.time()
+        try:
+            yield
+        except Exception:
+            self.record(category, name, time.time() - start_time, error=True)
+            raise
+        else:
+            self.record(category, name, time.time() - start_time)
+
+    def to_dict(self):
+        """
+
+        :rtype: dict
+        """
+        with self._lock:
+            return OrderedDict((
+                ("command", self.command),
+                ("resource", self.resource_name),
+                ("duration", round(time.time() - self._start_time, 3)),
+                ("phases", OrderedDict((name, round(duration, 3)) for name, duration in self._phases.iteritems())),
+                ("counters", OrderedDict(self._counters)),
+                ("operations", OrderedDict((category, OrderedDict((name, stats.to_dict())
+                                                                  for name, stats in operations.iteritems()))
+                                           for category, operations in self._operations.iteritems())),
+            ))
+
+    def publish(self, logger):
+        """Log metrics summary as one JSON line and pass it to the registered hooks
+
+        :param logging.Logger logger:
+        """
+        summary = self.to_dict()
+        logger.info("Command metrics: {}".format(json.dumps(summary)))
+
+        with _hooks_lock:
+            hooks = list(_hooks)
+
+        for hook in hooks:
+            try:
+                hook(summary)
+            except Exception:
+                logger.exception("Metrics hook {} failed:".format(hook))
@@ -0,0 +1,217 @@
+import random
+import socket
+import threading
+from datetime import datetime
+from datetime import timedelta
+
+from traffic.ixvm.vchassis.deadline import Deadline
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+
+
+DEFAULT_TCP_CONNECT_TIMEOUT = 0.5
+DEFAULT_TCP_POLL_INTERVAL = 1
+DEFAULT_MIN_POLL_INTERVAL = 1
+DEFAULT_MAX_POLL_INTERVAL = 10
+DEFAULT_BACKOFF_FACTOR = 2
+DEFAULT_BACKOFF_JITTER = 0.25
+DEFAULT_STRUCTURE_POLL_INTERVAL = 10
+DEFAULT_STRUCTURE_STABILITY_INTERVAL = 2
+
+
+class ReadinessProbeCancelled(Exception):
+    pass
+
+
+def is_tcp_port_open(host, port, timeout=DEFAULT_TCP_CONNECT_TIMEOUT):
+    """Check whether TCP connection to the given host and port can be established
+
+    :param str host: host address
+    :param int port: TCP port
+    :param float timeout: connection timeout in seconds
+    :rtype: bool
+    """
+    try:
+        sock = socket.create_connection((host, int(port)), timeout=timeout)
+    except (socket.error, socket.timeout):
+        return False
+
+    sock.close()
+    return True
+
+
+class AdaptiveBackoff(object):
+    def __init__(self, min_interval=DEFAULT_MIN_POLL_INTERVAL, max_interval=DEFAULT_MAX_POLL_INTERVAL,
+                 factor=DEFAULT_BACKOFF_FACTOR, jitter=DEFAULT_BACKOFF_JITTER):
+        """Exponential backoff with the random jitter
+
+        :param float min_interval: first interval in seconds
+        :param float max_interval: max interval in seconds
+        :param float factor: interval multiplier for the each next attempt
+        :param float jitter: max random deviation of the interval (fraction of the interval)
+        """
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._factor = factor
+        self._jitter = jitter
+        self._interval = min_interval
+
+    def reset(self):
+        """Start polling from the min interval again"""
+        self._interval = self._min_interval
+
+    def next_interval(self):
+        """Get the next interval to sleep
+
+        :rtype: float
+        """
+        interval = self._interval
+        self._interval = min(self._interval * self._factor, self._max_interval)
+        # jitter spreads polls of the chassis deployed at the same time
+        return max(0, interval * (1 + random.uniform(-self._jitter, self._jitter)))
+
+
+class ReadinessProbe(object):
+    def __init__(self, host, port, check, logger, timeout, min_interval=DEFAULT_MIN_POLL_INTERVAL,
+                 max_interval=DEFAULT_MAX_POLL_INTERVAL, tcp_connect_timeout=DEFAULT_TCP_CONNECT_TIMEOUT,
+                 tcp_poll_interval=DEFAULT_TCP_POLL_INTERVAL, name="service", cancel_event=None, metrics=None,
+                 deadline=None):
+        """Wait for the service readiness with the cheap TCP pre-check and adaptive backoff
+
+        While TCP port is closed (VM is still booting) the port is checked with the short fixed interval,
+        so its opening is noticed at once. After the port opens the service is polled with the intervals
+        growing from the min one up to the max one
+
+        :param str host: service host
+        :param int port: service TCP port
+        :param function check: function that returns True when the service is ready
+        :param logging.Logger logger:
+        :param int timeout: max time in seconds to wait for the service
+        :param float min_interval: min service poll interval in seconds
+        :param float max_interval: max service poll interval in seconds
+        :param float tcp_connect_timeout: TCP pre-check connection timeout in seconds
+        :param float tcp_poll_interval: interval in seconds between the TCP pre-checks while the port is closed
+        :param str name: service name for the log and error messages
+        :param threading.Event cancel_event: event that interrupts the waiting
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline: deadline of the whole command
+        """
+        self._host = host
+        self._port = port
+        self._check = check
+        self._logger = logger
+        self._timeout = timeout
+        self._tcp_connect_timeout = tcp_connect_timeout
+        self._tcp_poll_interval = tcp_poll_interval
+        self._name = name
+        self._cancel_event = cancel_event or threading.Event()
+        self._metrics = metrics or CommandMetrics()
+        self._deadline = deadline or Deadline()
+        self._backoff = AdaptiveBackoff(min_interval=min_interval, max_interval=max_interval)
+
+    def is_ready(self):
+        """Run the TCP pre-check and the service check if port is open
+
+        :return: tuple with flags whether port is open and whether service is ready
+        :rtype: tuple[bool, bool]
+        """
+        if not is_tcp_port_open(self._host, self._port, timeout=self._deadline.timeout(self._tcp_connect_timeout)):
+            return False, False
+
+        return True, self._check()
+
+    def wait(self):
+        """Wait until the service is ready
+
+        :raises Exception: if the service isn't ready within the timeout
+        :raises ReadinessProbeCancelled: if the waiting was cancelled
+        :raises traffic.ixvm.vchassis.deadline.DeadlineExceeded: if the command deadline is exceeded
+        """
+        timeout_time = datetime.now() + timedelta(seconds=self._timeout)
+        port_was_open = False
+
+        while True:
+            self._metrics.increment("{}_polls".format(self._name.lower()))
+            port_is_open, service_is_ready = self.is_ready()
+
+            if service_is_ready:
+                return
+
+            if not port_is_open:
+                self._logger.info("Waiting for the {} start...".format(self._name))
+                interval = self._tcp_poll_interval
+            else:
+                if not port_was_open:
+                    self._logger.info("{} port {} is open, waiting for the {} start..."
+                                      .format(self._host, self._port, self._name))
+                    self._backoff.reset()
+                else:
+                    self._logger.info("Waiting for the {} start...".format(self._name))
+
+                interval = self._backoff.next_interval()
+
+            port_was_open = port_is_open
+
+            if datetime.now() > timeout_time:
+                raise Exception("IxVM Chassis {} didn't start within {} minute(s)"
+                                .format(self._name, self._timeout / 60))
+
+            if self._cancel_event.wait(self._deadline.timeout(interval)):
+                raise ReadinessProbeCancelled("Waiting for the {} was cancelled".format(self._name))
+
+
+def wait_for_chassis_structure(api_client, logger, timeout, poll_interval=DEFAULT_STRUCTURE_POLL_INTERVAL,
+                               stability_interval=DEFAULT_STRUCTURE_STABILITY_INTERVAL, cancel_event=None,
+                               metrics=None, deadline=None):
+    """Will wait while chassis structure appears
+
+    Structure is polled with the cheap counts probe. Once cards and ports appeared the full inventory is fetched
+    as the confirming probe, it's returned only if its counts are the same as in the previous counts probe,
+    so the half-populated chassis isn't returned and the inventory is downloaded once on the stable chassis
+
+    :param traffic.ixvm.vchassis.api.client.IxVMChassisHTTPClient api_client:
+    :param logging.Logger logger:
+    :param int timeout: max time in seconds to wait for the chassis structure
+    :param float poll_interval: interval in seconds between the polls while the structure is empty
+    :param float stability_interval: interval in seconds between the polls once the structure appeared
+    :param threading.Event cancel_event: event that interrupts the waiting
+    :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+    :param traffic.ixvm.vchassis.deadline.Deadline deadline: deadline of the whole command
+    :return: inventory snapshot with the complete chassis structure
+    :rtype: traffic.ixvm.vchassis.api.client.InventorySnapshot
+    """
+    cancel_event = cancel_event or threading.Event()
+    metrics = metrics or CommandMetrics()
+    deadline = deadline or Deadline()
+    timeout_time = datetime.now() + timedelta(seconds=timeout)
+    previous_counts = None
+
+    while True:
+        metrics.increment("chassis_structure_polls")
+
+        if previous_counts is None:
+            counts = api_client.get_structure_counts()
+
+            if counts.is_structure_ready:
+                logger.info("Found {} Module(s) and {} Port(s), waiting until the chassis structure is stable..."
+                            .format(counts.cards, counts.ports))
+                previous_counts = counts
+            else:
+                logger.info("Waiting for chassis structure appearance...")
+        else:
+            snapshot = api_client.get_inventory_snapshot()
+
+            if snapshot.counts == previous_counts:
+                return snapshot
+
+            logger.info("Chassis structure was changed while fetching it, waiting until it's stable...")
+            counts = snapshot.counts
+            previous_counts = None
+
+        if datetime.now() > timeout_time:
+            raise Exception("Chassis data from IxVM Chassis service is empty or incomplete and didn't appear "
+                            "within {}".format(timeout / 60))
+
+        interval = stability_interval if counts.is_structure_ready else poll_interval
+
+        if cancel_event.wait(deadline.timeout(interval)):
+            raise ReadinessProbeCancelled("Waiting for the chassis structure was cancelled")
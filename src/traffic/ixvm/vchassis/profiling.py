@@ -0,0 +1,191 @@
+import os
+import re
+import tempfile
+import threading
+import time
+
+
+PROFILING_ENV_VARIABLE = "IXVM_DRIVER_PROFILING"
+PROFILE_FILE_EXTENSION = ".prof"
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+_UNSAFE_FILE_NAME_CHARS_RE = re.compile(r"[^\w.-]+")
+
+# thread start hook is global, so only one command of the driver process is profiled at a time
+_profiling_lock = threading.Lock()
+_thread_start = threading.Thread.start
+
+
+def is_profiling_enabled(command, resource_enabled=False):
+    """Whether the command should run under the profiler
+
+    Profiling is enabled by the resource attribute or by the environment variable of the execution server
+    which is either a boolean flag for all commands or a comma-separated list of the command names
+
+    :param str command: command name
+    :param bool resource_enabled: value of the resource profiling attribute
+    :rtype: bool
+    """
+    if resource_enabled:
+        return True
+
+    env_value = os.environ.get(PROFILING_ENV_VARIABLE, "").strip().lower()
+
+    if not env_value:
+        return False
+
+    return env_value in _TRUE_VALUES or command.lower() in [name.strip() for name in env_value.split(",")]
+
+
+def get_log_dir(logger):
+    """Get folder of the logger file, temp folder if the logger doesn't write to a file
+
+    :param logging.Logger logger:
+    :rtype: str
+    """
+    current_logger = logger
+
+    while current_logger is not None:
+        for handler in current_logger.handlers:
+            file_name = getattr(handler, "baseFilename", None)
+
+            if file_name:
+                return os.path.dirname(file_name)
+
+        current_logger = current_logger.parent if current_logger.propagate else None
+
+    return tempfile.gettempdir()
+
+
+class CommandProfiler(object):
+    def __init__(self, command, resource_name, reservation_id, logger, enabled=False):
+        """Run the driver command under cProfile and dump the profile next to the command log
+
+        Threads started by the command threads while it's profiled (autoload stages, concurrent requests)
+        are profiled too, their stats are merged into the one profile file. Threads of the other commands
+        running in the same process aren't profiled
+
+        :param str command: command name
+        :param str resource_name: resource name
+        :param str reservation_id: reservation ID, None for the commands outside the reservation
+        :param logging.Logger logger:
+        :param bool enabled: whether profiling is enabled, profiler does nothing otherwise
+        """
+        self._command = command
+        self._resource_name = resource_name
+        self._reservation_id = reservation_id
+        self._logger = logger
+        self._enabled = enabled
+        self._profiles = []
+        self._profiles_lock = threading.Lock()
+        self._started = False
+        self._thread_idents = set()
+
+    def _create_profile(self):
+        """
+
+        :rtype: cProfile.Profile
+        """
+        import cProfile
+
+        profile = cProfile.Profile()
+
+        with self._profiles_lock:
+            self._profiles.append(profile)
+
+        return profile
+
+    def _profile_thread_run(self, run):
+        """Wrap the thread target to run it under the thread profiler
+
+        :param function run: bound run method of the thread
+        :rtype: function
+        """
+        def profiled_run():
+            if not self._started:
+                return run()
+
+            thread_ident = threading.current_thread().ident
+            self._thread_idents.add(thread_ident)
+            profile = self._create_profile()
+            profile.enable()
+
+            try:
+                return run()
+            finally:
+                profile.disable()
+                self._thread_idents.discard(thread_ident)
+
+        return profiled_run
+
+    def _start_thread(self, thread):
+        """Hook replacing Thread.start while the command is profiled
+
+        Only threads started by the command thread or by the threads it started are profiled
+
+        :param threading.Thread thread:
+        """
+        if self._started and threading.current_thread().ident in self._thread_idents:
+            thread.run = self._profile_thread_run(thread.run)
+
+        _thread_start(thread)
+
+    def start(self):
+        """Start profiling if it's enabled"""
+        if not self._enabled:
+            return
+
+        if not _profiling_lock.acquire(False):
+            self._logger.warning("Another command is being profiled, run '{}' without profiling"
+                                 .format(self._command))
+            return
+
+        self._started = True
+        self._thread_idents.add(threading.current_thread().ident)
+        threading.Thread.start = lambda thread: self._start_thread(thread)
+        self._create_profile().enable()
+
+    def _get_profile_path(self):
+        """
+
+        :rtype: str
+        """
+        file_name = "--".join((self._resource_name,
+                               self._command,
+                               self._reservation_id or "no-reservation",
+                               time.strftime("%Y%m%d-%H%M%S")))
+
+        return os.path.join(get_log_dir(self._logger),
+                            _UNSAFE_FILE_NAME_CHARS_RE.sub("_", file_name) + PROFILE_FILE_EXTENSION)
+
+    def stop(self):
+        """Stop profiling and save the profile file
+
+        :return: path to the saved profile file, None if the command wasn't profiled
+        :rtype: str
+        """
+        if not self._started:
+            return
+
+        import pstats
+
+        self._started = False
+        threading.Thread.start = _thread_start
+        self._thread_idents.clear()
+        # profile of the current thread is the first one
+        self._profiles[0].disable()
+
+        try:
+            stats = pstats.Stats(*self._profiles)
+            profile_path = self._get_profile_path()
+            stats.dump_stats(profile_path)
+        except Exception:
+            self._logger.exception("Failed to save the '{}' command profile".format(self._command))
+            return
+        finally:
+            self._profiles = []
+            _profiling_lock.release()
+
+        self._logger.info("Command profile was saved to {}".format(profile_path))
+
+        return profile_path
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from traffic.ixvm.vchassis.autoload.pipeline import AutoloadProgress
+
+
+DEFAULT_MAX_AUTOLOAD_JOBS = 10
+
+
+class AutoloadJobInProgress(Exception):
+    def __init__(self, resource_name, status):
+        """Background Autoload job is started, but there is no known structure of the resource to return yet
+
+        :param str resource_name: resource full name
+        :param str status: job status
+        """
+        super(AutoloadJobInProgress, self).__init__(
+            "Background Autoload job of the resource {} is {}, run Autoload again when "
+            "Get Autoload Status reports succeeded".format(resource_name, status))
+        self.resource_name = resource_name
+        self.status = status
+
+
+class AutoloadJob(object):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(self, resource_name, func):
+        """Autoload of the one resource running in the background
+
+        :param str resource_name: resource full name
+        :param function func: function that accepts AutoloadProgress and returns autoload details
+        """
+        self.resource_name = resource_name
+        self.progress = AutoloadProgress()
+        self.status = self.QUEUED
+        self.result = None
+        self.error = None
+        self._func = func
+        self._submit_time = time.time()
+        self._start_time = None
+        self._finish_time = None
+
+    @property
+    def is_finished(self):
+        """
+
+        :rtype: bool
+        """
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def result_age(self):
+        """Seconds passed since the job finished, None while it isn't finished
+
+        :rtype: float
+        """
+        if self._finish_time is None:
+            return None
+
+        return time.time() - self._finish_time
+
+    def run(self):
+        """Run the job, its result or error is stored in the job"""
+        self._start_time = time.time()
+        self.status = self.RUNNING
+
+        try:
+            self.result = self._func(self.progress)
+        except Exception as e:
+            self.error = e
+            self.status = self.FAILED
+        else:
+            self.status = self.SUCCEEDED
+        finally:
+            self._finish_time = time.time()
+
+    def get_result(self):
+        """Get autoload details of the finished job
+
+        :raises Exception: error of the failed job
+        :rtype: cloudshell.shell.core.driver_context.AutoLoadDetails
+        """
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+    def to_dict(self):
+        """
+
+        :rtype: dict
+        """
+        now = time.time()
+        start_time = self._start_time or now
+
+        return OrderedDict((("resource", self.resource_name),
+                            ("status", self.status),
+                            ("queued", round(start_time - self._submit_time, 3)),
+                            ("elapsed", round((self._finish_time or now) - start_time, 3)
+                             if self._start_time else 0),
+                            ("phases", self.progress.to_dict()),
+                            ("error", str(self.error) if self.error is not None else None)))
+
+
+class AutoloadJobManager(object):
+    def __init__(self, max_workers=DEFAULT_MAX_AUTOLOAD_JOBS):
+        """Run autoload jobs of the driver process resources on the bounded worker pool
+
+        :param int max_workers: max amount of the autoload jobs running at the same time
+        """
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._pool = None
+
+    def _get_pool(self):
+        """Workers pool is created with the first job
+
+        :rtype: multiprocessing.pool.ThreadPool
+        """
+        if self._pool is None:
+            self._pool = ThreadPool(processes=self._max_workers)
+
+        return self._pool
+
+    def submit(self, resource_name, func):
+        """Submit autoload job of the resource, the unfinished job of the resource is returned if it exists
+
+        :param str resource_name: resource full name
+        :param function func: function that accepts AutoloadProgress and returns autoload details
+        :rtype: AutoloadJob
+        """
+        with self._lock:
+            job = self._jobs.get(resource_name)
+
+            if job is not None and not job.is_finished:
+                return job
+
+            job = self._jobs[resource_name] = AutoloadJob(resource_name=resource_name, func=func)
+            self._get_pool().apply_async(job.run)
+
+        return job
+
+    def get(self, resource_name):
+        """
+
+        :param str resource_name: resource full name
+        :rtype: AutoloadJob
+        """
+        with self._lock:
+            return self._jobs.get(resource_name)
+
+    def pop(self, resource_name):
+        """Forget the resource job once its result is delivered
+
+        :param str resource_name: resource full name
+        :rtype: AutoloadJob
+        """
+        with self._lock:
+            return self._jobs.pop(resource_name, None)
+
+
+autoload_job_manager = AutoloadJobManager()
@@ -0,0 +1,263 @@
+from cloudshell.devices.autoload.autoload_builder import AutoloadDetailsBuilder
+
+from traffic.ixvm.vchassis.autoload import models
+from traffic.ixvm.vchassis.autoload.inventory import InventoryIndex
+from traffic.ixvm.vchassis.autoload.pipeline import AutoloadPipeline
+from traffic.ixvm.vchassis.autoload.pipeline import AutoloadProgress
+from traffic.ixvm.vchassis.autoload.structure_cache import ChassisStructure
+from traffic.ixvm.vchassis.autoload.structure_cache import autoload_details_cache
+from traffic.ixvm.vchassis.deadline import Deadline
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbe
+from traffic.ixvm.vchassis.probes.readiness import wait_for_chassis_structure
+
+
+CHASSIS_STRUCTURE_APPEARANCE_TIMEOUT = 10 * 60
+
+
+class IxVMAutoloadRunner(object):
+    def __init__(self, api_client, configuration_runner, resource_config, shell_type, logger,
+                 autoload_cache=autoload_details_cache, metrics=None, deadline=None, prefetch=None,
+                 progress=None):
+        """
+
+        :param traffic.ixvm.vchassis.api.client.IxVMChassisHTTPClient api_client:
+        :param traffic.ixvm.vchassis.runners.configuration_runner.IxVMConfigurationRunner configuration_runner:
+        :param traffic.ixvm.vchassis.configuration_attributes_structure.IxVMVChassisResource resource_config:
+        :param str shell_type: shell type
+        :param logging.Logger logger:
+        :param traffic.ixvm.vchassis.autoload.structure_cache.AutoloadDetailsCache autoload_cache:
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline: deadline of the whole autoload
+        :param traffic.ixvm.vchassis.runners.inventory_prefetch.InventoryPrefetch prefetch: inventory prefetch
+            started by the driver initialization
+        :param traffic.ixvm.vchassis.autoload.pipeline.AutoloadProgress progress: progress of the autoload phases
+        """
+        self._api_client = api_client
+        self._configuration_runner = configuration_runner
+        self._resource_config = resource_config
+        self._shell_type = shell_type
+        self._logger = logger
+        self._autoload_cache = autoload_cache
+        self._metrics = metrics or CommandMetrics()
+        self._deadline = deadline or Deadline()
+        self._prefetch = prefetch
+        self._progress = progress or AutoloadProgress()
+
+    def _wait_for_cli(self, cancel_event):
+        """Wait while CLI TCP port opens
+
+        :param threading.Event cancel_event:
+        """
+        probe = ReadinessProbe(host=self._resource_config.address,
+                               port=self._resource_config.cli_tcp_port,
+                               check=lambda: True,
+                               logger=self._logger,
+                               timeout=self._resource_config.service_starting_timeout,
+                               min_interval=self._resource_config.service_poll_min_interval,
+                               max_interval=self._resource_config.service_poll_max_interval,
+                               name="CLI",
+                               cancel_event=cancel_event,
+                               metrics=self._metrics,
+                               deadline=self._deadline)
+        probe.wait()
+
+    def _wait_for_service_deployment(self, cancel_event):
+        """Wait while Chassis REST service starts
+
+        :param threading.Event cancel_event:
+        """
+        probe = ReadinessProbe(host=self._api_client.address,
+                               port=self._api_client.port,
+                               check=lambda: self._api_client.check_if_service_is_deployed(self._logger),
+                               logger=self._logger,
+                               timeout=self._resource_config.service_starting_timeout,
+                               min_interval=self._resource_config.service_poll_min_interval,
+                               max_interval=self._resource_config.service_poll_max_interval,
+                               name="service",
+                               cancel_event=cancel_event,
+                               metrics=self._metrics,
+                               deadline=self._deadline)
+        probe.wait()
+
+    def _wait_for_chassis_structure(self, cancel_event):
+        """Will wait while chassis structure appears
+
+        :param threading.Event cancel_event:
+        :rtype: traffic.ixvm.vchassis.api.client.InventorySnapshot
+        """
+        return wait_for_chassis_structure(api_client=self._api_client,
+                                          logger=self._logger,
+                                          timeout=CHASSIS_STRUCTURE_APPEARANCE_TIMEOUT,
+                                          cancel_event=cancel_event,
+                                          metrics=self._metrics,
+                                          deadline=self._deadline)
+
+    def _get_chassis_structure(self, pipeline, cancel_event):
+        """Get prefetched chassis structure or wait while it appears
+
+        Prefetched inventory is used only if the license server configuration didn't restart IxVM service
+
+        :param AutoloadPipeline pipeline:
+        :param threading.Event cancel_event:
+        :rtype: traffic.ixvm.vchassis.api.client.InventorySnapshot
+        """
+        if self._prefetch is not None:
+            if pipeline.get_result("license_server"):
+                self._logger.info("IxVM service was restarted, prefetched inventory is ignored")
+                self._prefetch.cancel()
+            else:
+                snapshot = self._prefetch.get_snapshot()
+
+                if snapshot is not None:
+                    self._logger.info("Use prefetched inventory")
+                    self._metrics.increment("prefetch_hits")
+                    return snapshot
+
+        return self._wait_for_chassis_structure(cancel_event)
+
+    def prefetch_inventory(self, cancel_event):
+        """Wait for the Chassis REST service, log in and fetch the chassis inventory without the CLI configuration
+
+        :param threading.Event cancel_event:
+        :rtype: traffic.ixvm.vchassis.api.client.InventorySnapshot
+        """
+        self._wait_for_service_deployment(cancel_event)
+        self._api_client.login()
+
+        return self._wait_for_chassis_structure(cancel_event)
+
+    def _build_pipeline(self):
+        """Create autoload pipeline
+
+        SSH license server configuration starts as soon as CLI is reachable, in parallel with
+        the REST service deployment waiting. License server configuration restarts the REST service,
+        so its start is tracked again before the login
+
+        :rtype: AutoloadPipeline
+        """
+        pipeline = AutoloadPipeline(logger=self._logger,
+                                    metrics=self._metrics,
+                                    deadline=self._deadline,
+                                    progress=self._progress)
+        cancel_event = pipeline.cancel_event
+
+        pipeline.add_stage(name="cli_reachable",
+                           func=lambda: self._wait_for_cli(cancel_event))
+
+        pipeline.add_stage(name="service_deployed",
+                           func=lambda: self._wait_for_service_deployment(cancel_event))
+
+        pipeline.add_stage(name="license_server",
+                           func=lambda: self._configuration_runner.configure_license_server(
+                               license_server_ip=self._resource_config.license_server),
+                           depends_on=("cli_reachable",))
+
+        pipeline.add_stage(name="service_restarted",
+                           func=lambda: self._wait_for_service_deployment(cancel_event),
+                           depends_on=("license_server", "service_deployed"))
+
+        pipeline.add_stage(name="login",
+                           func=self._api_client.login,
+                           depends_on=("service_restarted",))
+
+        pipeline.add_stage(name="chassis_structure",
+                           func=lambda: self._get_chassis_structure(pipeline, cancel_event),
+                           depends_on=("login",))
+
+        return pipeline
+
+    def _log_structure_diff(self, structure):
+        """Log only modules and ports added or removed since the last autoload
+
+        :param traffic.ixvm.vchassis.autoload.structure_cache.ChassisStructure structure:
+        """
+        previous_structure = self._autoload_cache.get_structure(self._resource_config.fullname)
+
+        if previous_structure is None:
+            return
+
+        diff = structure.diff(previous_structure)
+        self._logger.info("Chassis structure was changed since the last autoload. "
+                          "Added modules: {}, removed modules: {}, added ports: {}, removed ports: {}"
+                          .format(diff.added_modules, diff.removed_modules, diff.added_ports, diff.removed_ports))
+
+    def discover(self):
+        """Discover the chassis structure
+
+        Autoload details of the previous autoload are returned if the chassis structure wasn't changed
+
+        :rtype: cloudshell.shell.core.driver_context.AutoLoadDetails
+        """
+        try:
+            results = self._build_pipeline().run()
+        finally:
+            if self._prefetch is not None:
+                self._prefetch.cancel()
+
+        snapshot = results["chassis_structure"]
+        structure = ChassisStructure.from_snapshot(snapshot)
+
+        autoload_details = self._autoload_cache.get(self._resource_config.fullname, structure)
+
+        if autoload_details is not None:
+            self._logger.info("Chassis structure {} wasn't changed, reuse the previous autoload details"
+                              .format(structure.fingerprint))
+            return autoload_details
+
+        self._log_structure_diff(structure)
+        # details of the previous structure mustn't be returned as the last known ones if the build fails
+        self._autoload_cache.invalidate(self._resource_config.fullname)
+
+        self._progress.set_status("build_autoload_details", AutoloadProgress.RUNNING)
+
+        try:
+            with self._metrics.phase("build_autoload_details"):
+                autoload_details = self._build_autoload_details(snapshot)
+        except Exception:
+            self._progress.set_status("build_autoload_details", AutoloadProgress.FAILED)
+            raise
+
+        self._progress.set_status("build_autoload_details", AutoloadProgress.FINISHED)
+        self._autoload_cache.set(self._resource_config.fullname, structure, autoload_details)
+
+        return autoload_details
+
+    def _build_autoload_details(self, snapshot):
+        """Build autoload details from the chassis inventory
+
+        :param traffic.ixvm.vchassis.api.client.InventorySnapshot snapshot:
+        :rtype: cloudshell.shell.core.driver_context.AutoLoadDetails
+        """
+        chassis_data = snapshot.chassis[0]
+        chassis_id = chassis_data["id"]
+
+        chassis_res = models.IxVMChassis(shell_type=self._shell_type,
+                                         shell_name=self._resource_config.shell_name,
+                                         name="IxVm Virtual Chassis {}".format(chassis_id),
+                                         unique_id=chassis_id)
+
+        inventory = InventoryIndex.build(cards_data=snapshot.cards, ports_data=snapshot.ports)
+        self._logger.info("Found {} Module(s) and {} Port(s) on the Chassis"
+                          .format(len(inventory.cards), inventory.ports_count))
+
+        if inventory.orphan_ports:
+            self._logger.warning("Skipped {} Port(s) with unknown parent Module".format(len(inventory.orphan_ports)))
+
+        for card in inventory.cards:
+            module_res = models.IxVMModule(shell_name=self._resource_config.shell_name,
+                                           name="IxVm Virtual Module {}".format(card.number),
+                                           unique_id=card.id)
+
+            self._logger.info("Adding Module {} with {} Port(s) to the Chassis".format(card.number, len(card.ports)))
+            chassis_res.add_sub_resource(card.number, module_res)
+
+            for nw_adapter_number, port in enumerate(card.ports, start=2):  # first nw adapter port is MGMT
+                port_res = models.IxVMPort(shell_name=self._resource_config.shell_name,
+                                           name="Port {}".format(port.number),
+                                           unique_id=port.id)
+                port_res.requested_vnic_name = nw_adapter_number
+                self._logger.debug("Adding Port %s under the module %s", port.number, card.id)
+                module_res.add_sub_resource(port.number, port_res)
+
+        return AutoloadDetailsBuilder(chassis_res).autoload_details()
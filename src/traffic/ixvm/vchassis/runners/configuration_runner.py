@@ -4,18 +4,23 @@ from traffic.ixvm.vchassis.flows.configure_license_server_flow import IxVMConfig
 
 
 class IxVMConfigurationRunner(object):
-    def __init__(self, cli, cs_api, resource_config, logger):
+    def __init__(self, cli, cs_api, resource_config, logger, metrics=None, deadline=None):
         """
 
         :param cloudshell.cli.cli.CLI cli: CLI object
         :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_api: cloudshell API object
         :param traffic.teravm.controller.configuration_attributes_structure.TrafficGeneratorControllerResource resource_config:
         :param logging.Logger logger:
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        :param traffic.ixvm.vchassis.deadline.Deadline deadline:
         """
         self._cli = cli
         self._cs_api = cs_api
         self._resource_config = resource_config
         self._logger = logger
+        self._metrics = metrics
+        self._deadline = deadline
+        self._cli_handler = None
 
     @property
     def cli_handler(self):
@@ -23,10 +28,12 @@ class IxVMConfigurationRunner(object):
 
         :rtype: IxVMControllerCliHandler
         """
-        return IxVMControllerCliHandler(self._cli,
-                                        self._resource_config,
-                                        self._logger,
-                                        self._cs_api)
+        if self._cli_handler is None:
+            self._cli_handler = IxVMControllerCliHandler(self._cli,
+                                                         self._resource_config,
+                                                         self._logger,
+                                                         self._cs_api)
+        return self._cli_handler
 
     @property
     def configure_license_server_flow(self):
@@ -37,11 +44,15 @@ class IxVMConfigurationRunner(object):
         return IxVMConfigureLicenseServerFlow(cli_handler=self.cli_handler,
                                               resource_config=self._resource_config,
                                               cs_api=self._cs_api,
-                                              logger=self._logger)
+                                              logger=self._logger,
+                                              metrics=self._metrics,
+                                              deadline=self._deadline)
 
     def configure_license_server(self, license_server_ip):
         """
 
         :param str license_server_ip:
+        :return: whether IxVM service was restarted
+        :rtype: bool
         """
         return self.configure_license_server_flow.execute_flow(license_server_ip)
@@ -0,0 +1,188 @@
+import itertools
+from collections import OrderedDict
+from collections import namedtuple
+
+from cloudshell.api.cloudshell_api import AttributeNameValue
+from cloudshell.api.cloudshell_api import SetConnectorRequest
+
+from traffic.ixvm.vchassis.cs_api_helper import call_cs_api
+from traffic.ixvm.vchassis.cs_api_helper import iter_resource_ports
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+
+
+ATTR_REQUESTED_VNIC_NAME = "Requested vNIC Name"
+ATTR_REQUESTED_SOURCE_VNIC = "Requested Source vNIC Name"
+ATTR_REQUESTED_TARGET_VNIC = "Requested Target vNIC Name"
+
+ConnectorMapping = namedtuple("ConnectorMapping", ["source", "target", "direction", "source_vnic", "target_vnic"])
+
+
+class IxVMConnectChildResourcesRunner(object):
+    def __init__(self, logger, cs_api, metrics=None):
+        """Reconnect resource connectors to its ports with the batched CloudShell API calls
+
+        Unlike the generic ConnectChildResourcesRunner the connectors that are already connected to the
+        resource ports are left as is, so the repeated run (e.g. setup after the background Autoload)
+        doesn't remove and recreate them
+
+        :param logging.Logger logger:
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_api:
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        """
+        self._logger = logger
+        self._cs_api = cs_api
+        self._metrics = metrics or CommandMetrics()
+
+    @staticmethod
+    def _get_attribute_value(resource, attribute_name):
+        """
+
+        :param cloudshell.api.cloudshell_api.ResourceInfo resource:
+        :param str attribute_name: attribute name without the namespace
+        :rtype: str
+        """
+        for attribute in resource.ResourceAttributes:
+            if attribute.Name.endswith(attribute_name):  # support both 1st and 2nd Gen shells
+                return attribute.Value
+
+    def get_ports(self, resource_name, port_model):
+        """Get all resource ports with the one API call
+
+        :param str resource_name: resource full name
+        :param str port_model: port model name
+        :return: ports sorted by their requested vNIC names
+        :rtype: collections.OrderedDict[str, cloudshell.api.cloudshell_api.ResourceInfo]
+        """
+        resource = call_cs_api(self._cs_api, self._metrics, "GetResourceDetails", resource_name)
+        ports = {self._get_attribute_value(port, ATTR_REQUESTED_VNIC_NAME): port
+                 for port in iter_resource_ports(resource.ChildResources, port_model)}
+
+        return OrderedDict(sorted(ports.items(), key=lambda item: (len(item[0] or ""), item[0])))
+
+    @staticmethod
+    def _is_connected_to_port(endpoint, resource_name):
+        """Whether connector endpoint is already the resource sub-resource (port) and not the resource itself
+
+        :param str endpoint: connector endpoint full name
+        :param str resource_name: resource full name
+        :rtype: bool
+        """
+        return endpoint.startswith("{}/".format(resource_name))
+
+    def _map_connectors(self, connectors, ports, resource_name):
+        """Calculate new connectors between the resource ports and the other endpoints
+
+        :param list connectors: connectors of the resource
+        :param collections.OrderedDict ports: resource ports by their vNIC names
+        :param str resource_name: resource full name
+        :return: endpoints pairs (source, target) to disconnect and new connectors
+        :rtype: tuple[list[str], list[ConnectorMapping]]
+        """
+        connected_ports = set()
+        new_connectors = []
+
+        for connector in connectors:
+            connector_ports = {endpoint for endpoint in (connector.source, connector.target)
+                               if self._is_connected_to_port(endpoint, resource_name)}
+
+            if connector_ports:
+                self._logger.debug("Connector %s <-> %s is already connected to the port, skip it",
+                                   connector.source, connector.target)
+                connected_ports.update(connector_ports)
+            else:
+                new_connectors.append(connector)
+
+        # ports of the skipped connectors are in use and can't be given to the new ones
+        free_ports = OrderedDict((vnic, port) for vnic, port in ports.iteritems() if port.Name not in connected_ports)
+        to_disconnect = OrderedDict()
+        requested = []
+
+        for connector in new_connectors:
+            to_disconnect[(connector.source, connector.target)] = None
+            is_source = resource_name in connector.source.split("/")
+            source_vnics = connector.attributes.get(ATTR_REQUESTED_SOURCE_VNIC, "").split(",")
+            target_vnics = connector.attributes.get(ATTR_REQUESTED_TARGET_VNIC, "").split(",")
+
+            for source_vnic, target_vnic in itertools.izip_longest(source_vnics, target_vnics):
+                vnic = source_vnic if is_source else target_vnic
+                port = None
+
+                if vnic:
+                    try:
+                        port = free_ports.pop(vnic)
+                    except KeyError:
+                        raise Exception("Port with the requested vNIC '{}' not found or already connected on the "
+                                        "resource {}".format(vnic, resource_name))
+
+                requested.append((connector, is_source, port, source_vnic, target_vnic))
+
+        mappings = []
+        for connector, is_source, port, source_vnic, target_vnic in requested:
+            if port is None:
+                # ports without requested vNIC are taken only after all requested ones are reserved
+                if not free_ports:
+                    raise Exception("No free ports left on the resource {}".format(resource_name))
+                _, port = free_ports.popitem(last=False)
+
+            mappings.append(ConnectorMapping(source=port.Name if is_source else connector.source,
+                                             target=connector.target if is_source else port.Name,
+                                             direction=connector.direction,
+                                             source_vnic=source_vnic,
+                                             target_vnic=target_vnic))
+
+        return list(itertools.chain.from_iterable(to_disconnect)), mappings
+
+    def connect_child_resources(self, connectors, ports, resource_name, reservation_id):
+        """Replace resource connectors with the connectors to its ports
+
+        All mappings are calculated in memory, connectors are removed and created with one API call each
+
+        :param list connectors: connectors of the resource
+        :param collections.OrderedDict ports: resource ports by their vNIC names
+        :param str resource_name: resource full name
+        :param str reservation_id:
+        :rtype: str
+        """
+        if not connectors:
+            return "Success"
+
+        to_disconnect, mappings = self._map_connectors(connectors=connectors,
+                                                       ports=ports,
+                                                       resource_name=resource_name)
+        if not mappings:
+            self._logger.info("All connectors are already connected to the resource ports")
+            return "Success"
+
+        self._logger.info("Reconnecting {} connector(s) to the resource ports".format(len(mappings)))
+        call_cs_api(self._cs_api, self._metrics, "RemoveConnectorsFromReservation", reservation_id, to_disconnect)
+
+        call_cs_api(self._cs_api,
+                    self._metrics,
+                    "SetConnectorsInReservation",
+                    reservation_id,
+                    [SetConnectorRequest(SourceResourceFullName=mapping.source,
+                                         TargetResourceFullName=mapping.target,
+                                         Direction=mapping.direction,
+                                         Alias=None) for mapping in mappings])
+
+        for mapping in mappings:
+            connector_attrs = []
+
+            if mapping.source_vnic:
+                connector_attrs.append(AttributeNameValue(Name=ATTR_REQUESTED_SOURCE_VNIC,
+                                                          Value=mapping.source_vnic))
+            if mapping.target_vnic:
+                connector_attrs.append(AttributeNameValue(Name=ATTR_REQUESTED_TARGET_VNIC,
+                                                          Value=mapping.target_vnic))
+
+            # CloudShell API has no bulk call for the connector attributes
+            if connector_attrs:
+                call_cs_api(self._cs_api,
+                            self._metrics,
+                            "SetConnectorAttributes",
+                            reservationId=reservation_id,
+                            sourceResourceFullName=mapping.source,
+                            targetResourceFullName=mapping.target,
+                            attributeRequests=connector_attrs)
+
+        return "Success"
@@ -0,0 +1,122 @@
+import threading
+import time
+
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbeCancelled
+
+
+PREFETCH_MAX_AGE = 30 * 60
+
+
+class InventoryPrefetch(object):
+    def __init__(self, resource_name, prefetch_func, logger_factory):
+        """Fetch the chassis inventory snapshot on the worker thread before the Autoload is called
+
+        :param str resource_name: resource full name
+        :param function prefetch_func: function that accepts cancel event and logger and returns inventory snapshot
+        :param function logger_factory: function that creates logger, it's called on the worker thread
+        """
+        self.resource_name = resource_name
+        self.cancel_event = threading.Event()
+        self._prefetch_func = prefetch_func
+        self._logger_factory = logger_factory
+        self._finished = threading.Event()
+        self._finished_time = None
+        self._snapshot = None
+        self._thread = threading.Thread(target=self._run, name="inventory-prefetch-{}".format(resource_name))
+        self._thread.daemon = True
+
+    def _run(self):
+        logger = None
+
+        try:
+            logger = self._logger_factory()
+            logger.info("Start inventory prefetch of the resource {}".format(self.resource_name))
+            self._snapshot = self._prefetch_func(self.cancel_event, logger)
+            logger.info("Inventory of the resource {} was prefetched".format(self.resource_name))
+        except ReadinessProbeCancelled:
+            logger.info("Inventory prefetch of the resource {} was cancelled".format(self.resource_name))
+        except Exception:
+            if logger is None:
+                # prefetch is optional, the Autoload fetches the inventory itself
+                return
+
+            logger.warning("Inventory prefetch of the resource {} failed".format(self.resource_name),
+                                 exc_info=True)
+        finally:
+            self._finished_time = time.time()
+            self._finished.set()
+
+    def start(self):
+        """Start prefetching on the worker thread"""
+        self._thread.start()
+
+    def cancel(self):
+        """Interrupt prefetching, it's safe to call it for the finished prefetch"""
+        self.cancel_event.set()
+
+    def get_snapshot(self, max_age=PREFETCH_MAX_AGE):
+        """Get result of the finished prefetch
+
+        Running prefetch isn't waited for: by the time the Autoload needs the structure the service is
+        already up and logged in, so polling it directly is not slower than the prefetch backoff
+
+        :param float max_age: max age in seconds of the snapshot that can be used
+        :return: inventory snapshot, None if prefetch is still running, failed, was cancelled or is too old
+        :rtype: traffic.ixvm.vchassis.api.client.InventorySnapshot
+        """
+        if not self._finished.is_set():
+            return
+
+        if self._snapshot is not None and time.time() - self._finished_time <= max_age:
+            return self._snapshot
+
+
+class InventoryPrefetchRegistry(object):
+    def __init__(self):
+        """Inventory prefetches started by the driver instances of the process"""
+        self._lock = threading.Lock()
+        self._prefetches = {}
+
+    def start(self, resource_name, prefetch_func, logger_factory):
+        """Start the resource inventory prefetch, the previous one of the resource is cancelled
+
+        :param str resource_name: resource full name
+        :param function prefetch_func: function that accepts cancel event and logger and returns inventory snapshot
+        :param function logger_factory: function that creates logger, it's called on the worker thread
+        :rtype: InventoryPrefetch
+        """
+        prefetch = InventoryPrefetch(resource_name=resource_name,
+                                     prefetch_func=prefetch_func,
+                                     logger_factory=logger_factory)
+
+        with self._lock:
+            previous_prefetch = self._prefetches.get(resource_name)
+            self._prefetches[resource_name] = prefetch
+
+        if previous_prefetch is not None:
+            previous_prefetch.cancel()
+
+        prefetch.start()
+        return prefetch
+
+    def pop(self, resource_name):
+        """Take the resource prefetch, so it's used only once
+
+        :param str resource_name: resource full name
+        :rtype: InventoryPrefetch
+        """
+        with self._lock:
+            return self._prefetches.pop(resource_name, None)
+
+    def cancel(self, resource_name):
+        """Cancel and forget the resource prefetch
+
+        :param str resource_name: resource full name
+        """
+        prefetch = self.pop(resource_name)
+
+        if prefetch is not None:
+            prefetch.cancel()
+
+
+inventory_prefetch_registry = InventoryPrefetchRegistry()
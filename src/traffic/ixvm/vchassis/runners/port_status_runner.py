@@ -0,0 +1,244 @@
+import threading
+from collections import namedtuple
+
+from cloudshell.api.cloudshell_api import AttributeNameValue
+from cloudshell.api.cloudshell_api import ResourceAttributesUpdateRequest
+
+from traffic.ixvm.vchassis.cs_api_helper import call_cs_api
+from traffic.ixvm.vchassis.cs_api_helper import iter_resource_ports
+from traffic.ixvm.vchassis.metrics import CommandMetrics
+
+
+DEFAULT_PORT_STATUS_TIMEOUT = 5 * 60
+PORT_STATUS_FIELDS = ("id", "parentId", "portNumber", "linkState", "speed")
+CARD_NUMBER_FIELDS = ("id", "cardNumber")
+
+# IxOS port fields and the port attributes they are written to
+PORT_STATUS_ATTRIBUTES = (("linkState", "Link State"), ("speed", "Speed"))
+
+ResourcePort = namedtuple("ResourcePort", ["name", "attributes"])
+
+
+class ResourcePortStatus(object):
+    def __init__(self, card_numbers, ports):
+        """Ports layout of the resource and the last seen values of their status attributes
+
+        :param dict[str, str] card_numbers: IxOS card numbers by the card IDs
+        :param dict[tuple[str, str], ResourcePort] ports: resource ports by their (card number, port number)
+        """
+        self.card_numbers = card_numbers
+        self.ports = ports
+
+
+class PortStatusCache(object):
+    def __init__(self):
+        """Port status of the resources refreshed by the current driver process"""
+        self._lock = threading.Lock()
+        self._resources = {}
+
+    def get(self, resource_name):
+        """
+
+        :param str resource_name:
+        :rtype: ResourcePortStatus
+        """
+        with self._lock:
+            return self._resources.get(resource_name)
+
+    def set(self, resource_name, port_status):
+        """
+
+        :param str resource_name:
+        :param ResourcePortStatus port_status:
+        """
+        with self._lock:
+            self._resources[resource_name] = port_status
+
+    def invalidate(self, resource_name):
+        """
+
+        :param str resource_name:
+        """
+        with self._lock:
+            self._resources.pop(resource_name, None)
+
+
+port_status_cache = PortStatusCache()
+
+
+class IxVMPortStatusRunner(object):
+    def __init__(self, api_client, cs_api, logger, cache=port_status_cache, metrics=None):
+        """Refresh port status attributes without the full autoload
+
+        :param traffic.ixvm.vchassis.api.client.IxVMChassisHTTPClient api_client:
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_api:
+        :param logging.Logger logger:
+        :param PortStatusCache cache: last seen port status values shared between the commands
+        :param traffic.ixvm.vchassis.metrics.CommandMetrics metrics:
+        """
+        self._api_client = api_client
+        self._cs_api = cs_api
+        self._logger = logger
+        self._cache = cache
+        self._metrics = metrics or CommandMetrics()
+
+    @staticmethod
+    def _get_port_key(full_address):
+        """Get (card number, port number) from the port address, e.g. "192.168.1.10/M1/P2"
+
+        :param str full_address: port full address
+        :rtype: tuple[str, str]
+        """
+        address_parts = full_address.split("/")
+
+        if len(address_parts) < 3:
+            return
+
+        module_address, port_address = address_parts[-2:]
+
+        if module_address.startswith("M") and port_address.startswith("P"):
+            return module_address[1:], port_address[1:]
+
+    @staticmethod
+    def _get_status_attributes(resource):
+        """Get current values of the port status attributes by their full names
+
+        :param cloudshell.api.cloudshell_api.ResourceInfo resource:
+        :return: attribute values by the IxOS field names
+        :rtype: dict[str, tuple[str, str]]
+        """
+        attributes = {}
+
+        for attribute in resource.ResourceAttributes:
+            for field, attribute_name in PORT_STATUS_ATTRIBUTES:
+                # support both 1st and 2nd Gen shells
+                if attribute.Name == attribute_name or attribute.Name.endswith(".{}".format(attribute_name)):
+                    attributes[field] = (attribute.Name, attribute.Value)
+
+        return attributes
+
+    def _get_resource_ports(self, resource_name, port_model):
+        """Get all resource ports and their status attributes with the one API call
+
+        :param str resource_name: resource full name
+        :param str port_model: port model name
+        :rtype: dict[tuple[str, str], ResourcePort]
+        """
+        resource = call_cs_api(self._cs_api, self._metrics, "GetResourceDetails", resource_name)
+        ports = {}
+
+        for port in iter_resource_ports(resource.ChildResources, port_model):
+            port_key = self._get_port_key(port.FullAddress)
+
+            if port_key is not None:
+                ports[port_key] = ResourcePort(name=port.Name, attributes=self._get_status_attributes(port))
+
+        if ports and not any(port.attributes for port in ports.itervalues()):
+            self._logger.warning("Port model {} has no {} attributes, port status can't be updated"
+                                 .format(port_model, ", ".join(name for _, name in PORT_STATUS_ATTRIBUTES)))
+        return ports
+
+    def _get_card_numbers(self):
+        """
+
+        :return: IxOS card numbers by the card IDs
+        :rtype: dict[str, str]
+        """
+        return {str(card["id"]): str(card["cardNumber"])
+                for card in self._api_client.get_cards(fields=CARD_NUMBER_FIELDS)}
+
+    def _get_port_status(self, resource_name, port_model, ports_data):
+        """Get cached ports layout or load it if the chassis structure doesn't match it anymore
+
+        :param str resource_name: resource full name
+        :param str port_model: port model name
+        :param list[dict] ports_data: IxOS ports data
+        :rtype: ResourcePortStatus
+        """
+        port_status = self._cache.get(resource_name)
+
+        if port_status is not None:
+            card_ids = {str(port["parentId"]) for port in ports_data}
+
+            if card_ids.issubset(port_status.card_numbers):
+                port_keys = {(port_status.card_numbers[str(port["parentId"])], str(port["portNumber"]))
+                             for port in ports_data}
+
+                if port_keys.issubset(port_status.ports):
+                    return port_status
+
+            self._logger.info("Chassis structure was changed, reload the resource ports")
+
+        return ResourcePortStatus(card_numbers=self._get_card_numbers(),
+                                  ports=self._get_resource_ports(resource_name, port_model))
+
+    def refresh_port_status(self, resource_name, port_model):
+        """Update only the port status attributes whose values differ from the chassis ones
+
+        :param str resource_name: resource full name
+        :param str port_model: port model name
+        :rtype: str
+        """
+        self._api_client.login()
+
+        with self._metrics.phase("get_ports"):
+            ports_data = self._api_client.get_ports(fields=PORT_STATUS_FIELDS)
+
+        with self._metrics.phase("get_resource_ports"):
+            port_status = self._get_port_status(resource_name, port_model, ports_data)
+
+        update_requests = []
+        updated_attributes = []
+        chassis_ports = {}
+
+        for port_data in ports_data:
+            card_number = port_status.card_numbers.get(str(port_data["parentId"]))
+            port_key = (card_number, str(port_data["portNumber"]))
+            port = port_status.ports.get(port_key)
+
+            if port is None:
+                self._logger.warning("Port {} of the Module {} wasn't found on the resource, run Autoload to add it"
+                                     .format(port_data["portNumber"], card_number))
+                continue
+
+            chassis_ports[port_key] = port
+
+            port_attributes = []
+
+            for field, _ in PORT_STATUS_ATTRIBUTES:
+                if field not in port.attributes or port_data.get(field) is None:
+                    continue
+
+                attribute_name, current_value = port.attributes[field]
+                value = str(port_data[field])
+
+                if value != current_value:
+                    port_attributes.append(AttributeNameValue(Name=attribute_name, Value=value))
+                    updated_attributes.append((port, field, attribute_name, value))
+
+            if port_attributes:
+                update_requests.append(ResourceAttributesUpdateRequest(ResourceFullName=port.name,
+                                                                       AttributeNamesValues=port_attributes))
+
+        if update_requests:
+            self._logger.info("Updating {} attribute(s) on {} port(s)".format(len(updated_attributes),
+                                                                              len(update_requests)))
+            try:
+                with self._metrics.phase("set_attributes"):
+                    call_cs_api(self._cs_api, self._metrics, "SetAttributesValues", update_requests)
+            except Exception:
+                # attribute values of the resource are unknown after the failed update
+                self._cache.invalidate(resource_name)
+                raise
+
+            for port, field, attribute_name, value in updated_attributes:
+                port.attributes[field] = (attribute_name, value)
+
+        # ports removed from the chassis aren't kept, they are reloaded from the resource if they appear again
+        card_ids = {str(port_data["parentId"]) for port_data in ports_data}
+        self._cache.set(resource_name, ResourcePortStatus(card_numbers={card_id: card_number for card_id, card_number
+                                                                        in port_status.card_numbers.iteritems()
+                                                                        if card_id in card_ids},
+                                                          ports=chassis_ports))
+
+        return "Updated {} attribute(s) on {} port(s)".format(len(updated_attributes), len(update_requests))
@@ -0,0 +1,72 @@
+import threading
+import unittest
+
+from traffic.ixvm.vchassis.autoload.pipeline import AutoloadProgress
+from traffic.ixvm.vchassis.runners.autoload_jobs import AutoloadJob
+from traffic.ixvm.vchassis.runners.autoload_jobs import AutoloadJobManager
+
+
+class TestAutoloadJobManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = AutoloadJobManager(max_workers=2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def _wait_for_release(self, progress):
+        progress.set_status("stage", AutoloadProgress.RUNNING)
+        self.release.wait(5)
+        progress.set_status("stage", AutoloadProgress.FINISHED)
+        return "details"
+
+    def _wait_for_job(self, job):
+        for _ in xrange(500):
+            if job.is_finished:
+                return
+            threading.Event().wait(0.01)
+
+        self.fail("Job {} wasn't finished".format(job.resource_name))
+
+    def test_submit_returns_unfinished_job_of_the_resource(self):
+        job = self.manager.submit("chassis", self._wait_for_release)
+
+        self.assertIs(self.manager.submit("chassis", self._wait_for_release), job)
+        self.assertIsNot(self.manager.submit("other chassis", self._wait_for_release), job)
+
+        self.release.set()
+        self._wait_for_job(job)
+
+        self.assertEqual(job.status, AutoloadJob.SUCCEEDED)
+        self.assertEqual(job.get_result(), "details")
+        self.assertEqual(job.to_dict()["phases"]["stage"]["status"], AutoloadProgress.FINISHED)
+        self.assertIsNot(self.manager.submit("chassis", self._wait_for_release), job)
+
+    def test_jobs_over_the_pool_size_are_queued(self):
+        jobs = [self.manager.submit("chassis {}".format(index), self._wait_for_release) for index in xrange(3)]
+
+        self.assertEqual(jobs[2].status, AutoloadJob.QUEUED)
+
+        self.release.set()
+        for job in jobs:
+            self._wait_for_job(job)
+
+    def test_failed_job_raises_its_error(self):
+        error = ValueError("boom")
+
+        def fail(progress):
+            raise error
+
+        job = self.manager.submit("chassis", fail)
+        self._wait_for_job(job)
+
+        self.assertEqual(job.status, AutoloadJob.FAILED)
+        self.assertEqual(job.to_dict()["error"], "boom")
+        with self.assertRaises(ValueError):
+            job.get_result()
+
+    def test_pop_forgets_the_job(self):
+        job = self.manager.submit("chassis", self._wait_for_release)
+
+        self.assertIs(self.manager.pop("chassis"), job)
+        self.assertIsNone(self.manager.get("chassis"))
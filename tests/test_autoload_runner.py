@@ -0,0 +1,129 @@
+import unittest
+
+import mock
+
+from traffic.ixvm.vchassis.api.client import InventorySnapshot
+from traffic.ixvm.vchassis.autoload.structure_cache import AutoloadDetailsCache
+from traffic.ixvm.vchassis.autoload.structure_cache import ChassisStructure
+from traffic.ixvm.vchassis.runners.autoload_runner import IxVMAutoloadRunner
+
+
+RESOURCE_NAME = "ixvm"
+
+
+def create_snapshot(ports_count):
+    return InventorySnapshot(chassis=[{"id": 1}],
+                             cards=[{"id": 100, "cardNumber": 1}],
+                             ports=[{"id": 1000 + number, "parentId": 100, "portNumber": number}
+                                    for number in xrange(1, ports_count + 1)])
+
+
+class TestChassisStructure(unittest.TestCase):
+    def test_fingerprint_doesnt_depend_on_the_items_order(self):
+        snapshot = create_snapshot(ports_count=3)
+        reordered_snapshot = snapshot._replace(ports=list(reversed(snapshot.ports)))
+
+        self.assertEqual(ChassisStructure.from_snapshot(snapshot).fingerprint,
+                         ChassisStructure.from_snapshot(reordered_snapshot).fingerprint)
+
+    def test_fingerprint_changes_with_the_ports(self):
+        self.assertNotEqual(ChassisStructure.from_snapshot(create_snapshot(ports_count=3)).fingerprint,
+                            ChassisStructure.from_snapshot(create_snapshot(ports_count=4)).fingerprint)
+
+    def test_diff(self):
+        diff = ChassisStructure.from_snapshot(create_snapshot(ports_count=2)).diff(
+            ChassisStructure.from_snapshot(create_snapshot(ports_count=3)))
+
+        self.assertEqual(diff.added_modules, [])
+        self.assertEqual(diff.removed_modules, [])
+        self.assertEqual(diff.added_ports, [])
+        self.assertEqual(diff.removed_ports, [(1003, 100, 3)])
+
+
+class TestAutoloadDetailsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = AutoloadDetailsCache()
+        self.structure = ChassisStructure.from_snapshot(create_snapshot(ports_count=2))
+        self.cache.set(RESOURCE_NAME, self.structure, "details")
+
+    def test_hit_with_the_same_structure(self):
+        structure = ChassisStructure.from_snapshot(create_snapshot(ports_count=2))
+
+        self.assertEqual(self.cache.get(RESOURCE_NAME, structure), "details")
+
+    def test_miss_with_the_changed_structure(self):
+        structure = ChassisStructure.from_snapshot(create_snapshot(ports_count=3))
+
+        self.assertIsNone(self.cache.get(RESOURCE_NAME, structure))
+        self.assertEqual(self.cache.get_last(RESOURCE_NAME), "details")
+
+    def test_miss_of_the_unknown_resource(self):
+        self.assertIsNone(self.cache.get("other", self.structure))
+        self.assertIsNone(self.cache.get_last("other"))
+
+    def test_invalidate(self):
+        self.cache.invalidate(RESOURCE_NAME)
+
+        self.assertIsNone(self.cache.get(RESOURCE_NAME, self.structure))
+        self.assertIsNone(self.cache.get_structure(RESOURCE_NAME))
+        self.assertIsNone(self.cache.get_last(RESOURCE_NAME))
+
+
+class TestIxVMAutoloadRunnerDiscover(unittest.TestCase):
+    def setUp(self):
+        self.cache = AutoloadDetailsCache()
+        resource_config = mock.MagicMock(fullname=RESOURCE_NAME)
+        self.runner = IxVMAutoloadRunner(api_client=mock.MagicMock(),
+                                         configuration_runner=mock.MagicMock(),
+                                         resource_config=resource_config,
+                                         shell_type="CS_VirtualTrafficGeneratorChassis",
+                                         logger=mock.MagicMock(),
+                                         autoload_cache=self.cache)
+
+    def discover(self, snapshot, build_autoload_details):
+        pipeline = mock.MagicMock()
+        pipeline.run.return_value = {"chassis_structure": snapshot}
+
+        with mock.patch.object(self.runner, "_build_pipeline", return_value=pipeline), \
+                mock.patch.object(self.runner, "_build_autoload_details",
+                                  side_effect=build_autoload_details) as build_mock:
+            return self.runner.discover(), build_mock
+
+    def test_details_are_built_and_cached_on_the_first_autoload(self):
+        snapshot = create_snapshot(ports_count=2)
+
+        details, build_mock = self.discover(snapshot, lambda _: "details")
+
+        self.assertEqual(details, "details")
+        build_mock.assert_called_once_with(snapshot)
+        self.assertEqual(self.cache.get(RESOURCE_NAME, ChassisStructure.from_snapshot(snapshot)), "details")
+
+    def test_cached_details_are_reused_if_structure_wasnt_changed(self):
+        self.discover(create_snapshot(ports_count=2), lambda _: "details")
+
+        details, build_mock = self.discover(create_snapshot(ports_count=2), lambda _: "new details")
+
+        self.assertEqual(details, "details")
+        build_mock.assert_not_called()
+
+    def test_details_are_rebuilt_if_structure_was_changed(self):
+        self.discover(create_snapshot(ports_count=2), lambda _: "details")
+        snapshot = create_snapshot(ports_count=3)
+
+        details, build_mock = self.discover(snapshot, lambda _: "new details")
+
+        self.assertEqual(details, "new details")
+        build_mock.assert_called_once_with(snapshot)
+        self.assertEqual(self.cache.get_last(RESOURCE_NAME), "new details")
+        self.assertEqual(self.cache.get_structure(RESOURCE_NAME), ChassisStructure.from_snapshot(snapshot))
+
+    def test_cached_details_are_invalidated_if_build_of_the_changed_structure_fails(self):
+        self.discover(create_snapshot(ports_count=2), lambda _: "details")
+
+        def build_autoload_details(snapshot):
+            raise ValueError("build failed")
+
+        with self.assertRaises(ValueError):
+            self.discover(create_snapshot(ports_count=3), build_autoload_details)
+
+        self.assertIsNone(self.cache.get_last(RESOURCE_NAME))
@@ -0,0 +1,78 @@
+import io
+import json
+import unittest
+
+import requests
+
+from traffic.ixvm.vchassis.api.client import IxVMChassisHTTPClient
+from traffic.ixvm.vchassis.api.session_cache import ApiKeyCache
+
+
+def create_response(status_code, data):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.url = "https://192.0.2.10"
+    resp.raw = io.BytesIO(json.dumps(data))
+    return resp
+
+
+class FakeSession(object):
+    def __init__(self, valid_api_keys):
+        """Session that accepts only the given API keys, every login creates the next API key
+
+        :param list[str] valid_api_keys:
+        """
+        self.requests = []
+        self.logins = 0
+        self.valid_api_keys = valid_api_keys
+
+    def request(self, method, url, headers, **kwargs):
+        self.requests.append((method, url.split("/", 3)[-1], headers.get("x-api-key")))
+
+        if url.endswith("auth/session"):
+            self.logins += 1
+            return create_response(200, {"apiKey": "api key {}".format(self.logins)})
+
+        if headers.get("x-api-key") not in self.valid_api_keys:
+            return create_response(401, {"error": "Unauthorized"})
+
+        return create_response(200, [{"id": 1}])
+
+
+class TestIxVMChassisHTTPClient(unittest.TestCase):
+    def _create_client(self, session, api_keys_cache):
+        return IxVMChassisHTTPClient(address="192.0.2.10",
+                                     user="admin",
+                                     password="admin",
+                                     session=session,
+                                     api_keys_cache=api_keys_cache)
+
+    def test_rejected_api_key_is_replaced_once(self):
+        session = FakeSession(valid_api_keys=["api key 2"])
+        api_keys_cache = ApiKeyCache()
+        client = self._create_client(session, api_keys_cache)
+        client.login()
+
+        self.assertEqual(client.get_chassis(), [{"id": 1}])
+
+        self.assertEqual([(method, path) for method, path, _ in session.requests],
+                         [("POST", "platform/api/v1/auth/session"),
+                          ("GET", "chassis/api/v2/ixos/chassis"),
+                          ("POST", "platform/api/v1/auth/session"),
+                          ("GET", "chassis/api/v2/ixos/chassis")])
+        self.assertEqual([api_key for method, _, api_key in session.requests if method == "GET"],
+                         ["api key 1", "api key 2"])
+        # the other clients of the controller get the new key from the cache
+        self._create_client(session, api_keys_cache).login()
+        self.assertEqual(session.logins, 2)
+
+    def test_request_is_retried_only_once(self):
+        session = FakeSession(valid_api_keys=[])
+        client = self._create_client(session, ApiKeyCache())
+        client.login()
+
+        with self.assertRaises(requests.HTTPError):
+            client.get_chassis()
+
+        self.assertEqual(session.logins, 2)
+        self.assertEqual(len(session.requests), 4)
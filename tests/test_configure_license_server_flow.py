@@ -0,0 +1,57 @@
+import unittest
+
+import mock
+
+from traffic.ixvm.vchassis.flows.configure_license_server_flow import IxVMConfigureLicenseServerFlow
+
+
+class FakeCliService(object):
+    def __init__(self, license_server_output):
+        """CLI service that records the sent commands
+
+        :param str license_server_output: output of the "show license-server" command
+        """
+        self.commands = []
+        self.session = mock.MagicMock()
+        self._license_server_output = license_server_output
+
+    def send_command(self, command, *args, **kwargs):
+        self.commands.append(command)
+
+        if command == "show license-server":
+            return self._license_server_output
+
+        return ""
+
+
+class TestIxVMConfigureLicenseServerFlow(unittest.TestCase):
+    def _execute_flow(self, license_server_output):
+        self.cli_service = FakeCliService(license_server_output)
+        cli_handler = mock.MagicMock()
+        cli_handler.get_cli_service.return_value.__enter__.return_value = self.cli_service
+        flow = IxVMConfigureLicenseServerFlow(cli_handler=cli_handler,
+                                              resource_config=mock.MagicMock(),
+                                              cs_api=None,
+                                              logger=mock.MagicMock())
+
+        return flow.execute_flow("192.0.2.1")
+
+    def test_configured_license_server_skips_restart(self):
+        self.assertFalse(self._execute_flow("License server: 192.0.2.1"))
+
+        self.assertEqual(self.cli_service.commands, ["show license-server"])
+        self.cli_service.session.set_active.assert_not_called()
+
+    def test_other_license_server_is_replaced_and_service_restarted(self):
+        self.assertTrue(self._execute_flow("license_server = 192.0.2.2"))
+
+        self.assertEqual(self.cli_service.commands, ["show license-server",
+                                                     "set license-server 192.0.2.1",
+                                                     "restart-service ixServer"])
+        # session is broken by the restart and mustn't be returned to the pool
+        self.cli_service.session.set_active.assert_called_once_with(False)
+
+    def test_unknown_license_server_is_configured(self):
+        self.assertTrue(self._execute_flow("unexpected output"))
+
+        self.assertEqual(len(self.cli_service.commands), 3)
@@ -0,0 +1,136 @@
+import unittest
+from collections import namedtuple
+
+import mock
+from cloudshell.traffic.virtual.runners.connect_child_resources import ConnectChildResourcesRunner
+
+from traffic.ixvm.vchassis.runners.connect_child_resources_runner import IxVMConnectChildResourcesRunner
+
+
+RESOURCE_NAME = "ixvm"
+PORT_MODEL = "IxVM Virtual Traffic Chassis 2G.VirtualTrafficGeneratorPort"
+MODULE_MODEL = "IxVM Virtual Traffic Chassis 2G.VirtualTrafficGeneratorModule"
+
+Attribute = namedtuple("Attribute", ["Name", "Value"])
+Resource = namedtuple("Resource", ["Name", "ResourceModelName", "ResourceAttributes", "ChildResources"])
+Connector = namedtuple("Connector", ["source", "target", "direction", "attributes"])
+
+
+class FakeCloudShellAPI(object):
+    def __init__(self, vnics):
+        """CloudShell API that records the calls, the resource has one module with the ports of the given vNICs
+
+        :param list[str] vnics: requested vNIC names of the ports
+        """
+        self.calls = []
+        ports = [Resource(Name="{}/M1/P{}".format(RESOURCE_NAME, vnic),
+                          ResourceModelName=PORT_MODEL,
+                          ResourceAttributes=[Attribute(Name="{}.Requested vNIC Name".format(PORT_MODEL),
+                                                        Value=vnic)],
+                          ChildResources=[])
+                 for vnic in vnics]
+        self._resource = Resource(Name=RESOURCE_NAME,
+                                  ResourceModelName="IxVM Virtual Traffic Chassis 2G",
+                                  ResourceAttributes=[],
+                                  ChildResources=[Resource(Name="{}/M1".format(RESOURCE_NAME),
+                                                           ResourceModelName=MODULE_MODEL,
+                                                           ResourceAttributes=[],
+                                                           ChildResources=ports)])
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+            if name == "GetResourceDetails":
+                return self._resource
+
+        return call
+
+    def get_calls(self, name):
+        return [(args, kwargs) for method_name, args, kwargs in self.calls if method_name == name]
+
+
+def create_connector(target, source_vnic="", target_vnic="", source=RESOURCE_NAME):
+    attributes = {}
+
+    if source_vnic:
+        attributes["Requested Source vNIC Name"] = source_vnic
+    if target_vnic:
+        attributes["Requested Target vNIC Name"] = target_vnic
+
+    return Connector(source=source, target=target, direction="bi", attributes=attributes)
+
+
+class TestIxVMConnectChildResourcesRunner(unittest.TestCase):
+    def setUp(self):
+        self.cs_api = FakeCloudShellAPI(vnics=["2", "3", "4", "5"])
+        self.runner = IxVMConnectChildResourcesRunner(logger=mock.MagicMock(), cs_api=self.cs_api)
+
+    def _connect(self, runner, connectors):
+        ports = runner.get_ports(resource_name=RESOURCE_NAME, port_model=PORT_MODEL)
+        return runner.connect_child_resources(connectors=connectors,
+                                              ports=ports,
+                                              resource_name=RESOURCE_NAME,
+                                              reservation_id="reservation")
+
+    def test_connectors_are_mapped_with_batched_calls(self):
+        connectors = [create_connector("vm1", source_vnic="3"),
+                      create_connector("vm2"),
+                      create_connector("vm3", source_vnic="2", target_vnic="1")]
+
+        self.assertEqual(self._connect(self.runner, connectors), "Success")
+
+        self.assertEqual([name for name, _, _ in self.cs_api.calls],
+                         ["GetResourceDetails", "RemoveConnectorsFromReservation", "SetConnectorsInReservation",
+                          "SetConnectorAttributes", "SetConnectorAttributes"])
+        (_, endpoints), _ = self.cs_api.get_calls("RemoveConnectorsFromReservation")[0]
+        self.assertEqual(endpoints, [RESOURCE_NAME, "vm1", RESOURCE_NAME, "vm2", RESOURCE_NAME, "vm3"])
+        (_, requests), _ = self.cs_api.get_calls("SetConnectorsInReservation")[0]
+        # connector without the requested vNIC gets the first free port after the requested ones are reserved
+        self.assertEqual([(request.SourceResourceFullName, request.TargetResourceFullName) for request in requests],
+                         [("ixvm/M1/P3", "vm1"), ("ixvm/M1/P4", "vm2"), ("ixvm/M1/P2", "vm3")])
+
+    def test_connectors_already_connected_to_ports_are_skipped(self):
+        connectors = [create_connector("vm1", source_vnic="3", source="ixvm/M1/P3"),
+                      create_connector("vm2", source_vnic="2")]
+
+        self._connect(self.runner, connectors)
+
+        (_, endpoints), _ = self.cs_api.get_calls("RemoveConnectorsFromReservation")[0]
+        self.assertEqual(endpoints, [RESOURCE_NAME, "vm2"])
+        (_, requests), _ = self.cs_api.get_calls("SetConnectorsInReservation")[0]
+        self.assertEqual([(request.SourceResourceFullName, request.TargetResourceFullName) for request in requests],
+                         [("ixvm/M1/P2", "vm2")])
+
+    def test_repeated_run_makes_no_connector_calls(self):
+        connectors = [create_connector("vm1", source_vnic="3", source="ixvm/M1/P3"),
+                      create_connector("vm2", source_vnic="2", source="ixvm/M1/P2")]
+        upstream_cs_api = FakeCloudShellAPI(vnics=["2", "3", "4", "5"])
+
+        self._connect(self.runner, connectors)
+        self._connect(ConnectChildResourcesRunner(logger=mock.MagicMock(), cs_api=upstream_cs_api), connectors)
+
+        self.assertEqual([name for name, _, _ in self.cs_api.calls], ["GetResourceDetails"])
+        # generic runner removes and recreates the connectors that are already connected to the ports
+        self.assertEqual(len(upstream_cs_api.calls), 5)
+
+    def test_unknown_vnic_raises_error_before_any_connector_change(self):
+        connectors = [create_connector("vm1", source_vnic="3"),
+                      create_connector("vm2", source_vnic="9")]
+
+        with self.assertRaisesRegexp(Exception, "requested vNIC '9' not found"):
+            self._connect(self.runner, connectors)
+
+        self.assertEqual([name for name, _, _ in self.cs_api.calls], ["GetResourceDetails"])
+
+    def test_ports_of_skipped_connectors_are_not_given_to_new_connectors(self):
+        connectors = [create_connector("switch1", source="ixvm/M1/P2"),
+                      create_connector("switch2")]
+
+        self._connect(self.runner, connectors)
+
+        (_, endpoints), _ = self.cs_api.get_calls("RemoveConnectorsFromReservation")[0]
+        self.assertEqual(endpoints, [RESOURCE_NAME, "switch2"])
+        (_, requests), _ = self.cs_api.get_calls("SetConnectorsInReservation")[0]
+        self.assertEqual([(request.SourceResourceFullName, request.TargetResourceFullName) for request in requests],
+                         [("ixvm/M1/P3", "switch2")])
@@ -0,0 +1,173 @@
+import json
+import threading
+import unittest
+
+import mock
+from cloudshell.shell.core.driver_context import AutoLoadCommandContext
+from cloudshell.shell.core.driver_context import InitCommandContext
+from cloudshell.shell.core.driver_context import ResourceContextDetails
+
+from driver import IxVMVirtualChassisDriver
+from driver import SHELL_NAME
+from traffic.ixvm.vchassis.autoload.structure_cache import AutoloadDetailsCache
+from traffic.ixvm.vchassis.runners.autoload_jobs import AutoloadJob
+from traffic.ixvm.vchassis.runners.autoload_jobs import AutoloadJobInProgress
+from traffic.ixvm.vchassis.runners.autoload_jobs import AutoloadJobManager
+from traffic.ixvm.vchassis.runners.inventory_prefetch import inventory_prefetch_registry
+
+
+def create_resource(address="192.0.2.10", attributes=None):
+    """
+
+    :param str address:
+    :param dict attributes: attributes without the namespace
+    :rtype: ResourceContextDetails
+    """
+    return ResourceContextDetails(id="id", name="ixvm", fullname="ixvm", type="Resource", address=address,
+                                      model=SHELL_NAME, family="CS_VirtualTrafficGeneratorChassis",
+                                      description="", app_context=None, networks_info=None,
+                                      shell_standard=None, shell_standard_version=None,
+                                      attributes={"{}.{}".format(SHELL_NAME, name): value
+                                                  for name, value in (attributes or {}).iteritems()})
+
+
+def create_init_context(address="192.0.2.10", inventory_prefetch=True):
+    """
+
+    :param str address:
+    :param bool inventory_prefetch:
+    :rtype: InitCommandContext
+    """
+    return InitCommandContext(connectivity=mock.MagicMock(),
+                              resource=create_resource(address=address,
+                                                       attributes={"Inventory Prefetch": str(inventory_prefetch)}))
+
+
+@mock.patch("driver.get_inventory_logger")
+class TestDriverInitialize(unittest.TestCase):
+    def setUp(self):
+        self.driver = IxVMVirtualChassisDriver()
+
+    def tearDown(self):
+        self.driver.cleanup()
+
+    def test_initialize_starts_prefetch_with_init_context(self, get_inventory_logger):
+        snapshot = mock.MagicMock()
+
+        with mock.patch.object(self.driver, "_prefetch_inventory", return_value=snapshot) as prefetch_inventory:
+            self.assertEqual(self.driver.initialize(create_init_context()), "Finished initializing")
+            prefetch = inventory_prefetch_registry.pop("ixvm")
+            prefetch._thread.join(5)
+
+        self.assertIs(prefetch.get_snapshot(), snapshot)
+        get_inventory_logger.assert_called_with("ixvm")
+        self.assertIs(prefetch_inventory.call_args[0][2], get_inventory_logger.return_value)
+
+    def test_initialize_without_address_skips_prefetch(self, get_inventory_logger):
+        self.assertEqual(self.driver.initialize(create_init_context(address="NA")), "Finished initializing")
+
+        self.assertIsNone(inventory_prefetch_registry.pop("ixvm"))
+
+    def test_initialize_skips_disabled_prefetch(self, get_inventory_logger):
+        self.assertEqual(self.driver.initialize(create_init_context(inventory_prefetch=False)),
+                         "Finished initializing")
+
+        self.assertIsNone(inventory_prefetch_registry.pop("ixvm"))
+
+    def test_initialize_skips_prefetch_of_discovered_resource(self, get_inventory_logger):
+        details_cache = AutoloadDetailsCache()
+        details_cache.set("ixvm", mock.MagicMock(), "last details")
+
+        with mock.patch("traffic.ixvm.vchassis.autoload.structure_cache.autoload_details_cache", details_cache):
+            self.assertEqual(self.driver.initialize(create_init_context()), "Finished initializing")
+
+        self.assertIsNone(inventory_prefetch_registry.pop("ixvm"))
+
+    def test_initialize_ignores_prefetch_start_error(self, get_inventory_logger):
+        with mock.patch.object(inventory_prefetch_registry, "start", side_effect=RuntimeError("no threads")):
+            self.assertEqual(self.driver.initialize(create_init_context()), "Finished initializing")
+
+        get_inventory_logger.return_value.warning.assert_called_once()
+
+
+@mock.patch("driver.get_logger_with_thread_id", mock.MagicMock())
+class TestDriverBackgroundAutoload(unittest.TestCase):
+    def setUp(self):
+        self.driver = IxVMVirtualChassisDriver()
+        self.context = AutoLoadCommandContext(connectivity=mock.MagicMock(),
+                                              resource=create_resource(attributes={"Background Autoload": "True"}))
+        self.job_manager = AutoloadJobManager(max_workers=1)
+        self.details_cache = AutoloadDetailsCache()
+        self.release = threading.Event()
+        self.discover_calls = []
+
+        for target, value in (("traffic.ixvm.vchassis.runners.autoload_jobs.autoload_job_manager", self.job_manager),
+                              ("traffic.ixvm.vchassis.autoload.structure_cache.autoload_details_cache",
+                               self.details_cache),
+                              ("driver.IxVMVirtualChassisDriver._discover", self._discover)):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.release.set()
+
+        # job resolves the patched discover when it starts, so it must finish before the next test
+        if self.job_manager.get("ixvm") is not None:
+            self._wait_for_job()
+
+    def _discover(self, context, resource_config, logger, progress=None):
+        self.discover_calls.append(progress)
+        self.release.wait(5)
+        return "new details"
+
+    def _wait_for_job(self):
+        job = self.job_manager.get("ixvm")
+
+        for _ in xrange(500):
+            if job.is_finished:
+                return
+            threading.Event().wait(0.01)
+
+        self.fail("Autoload job wasn't finished")
+
+    def test_returns_last_details_while_job_runs_and_job_result_after(self):
+        self.details_cache.set("ixvm", mock.MagicMock(), "last details")
+
+        self.assertEqual(self.driver.get_inventory(self.context), "last details")
+        self.assertEqual(self.driver.get_inventory(self.context), "last details")
+
+        self.release.set()
+        self._wait_for_job()
+
+        self.assertEqual(self.driver.get_inventory(self.context), "new details")
+        self.assertEqual(len(self.discover_calls), 1)
+        self.assertIsNone(self.job_manager.get("ixvm"))
+
+    def test_fails_instead_of_empty_details_without_known_structure(self):
+        with self.assertRaises(AutoloadJobInProgress):
+            self.driver.get_inventory(self.context)
+
+        self.assertIsNotNone(self.job_manager.get("ixvm"))
+
+    def test_autoload_status(self):
+        self.assertEqual(self.driver.get_autoload_status(self.context), '{"status": "none"}')
+
+        self.details_cache.set("ixvm", mock.MagicMock(), "last details")
+        self.driver.get_inventory(self.context)
+
+        self.assertIn(json.loads(self.driver.get_autoload_status(self.context))["status"], ("queued", "running"))
+
+    def test_outdated_job_result_is_dropped_and_new_job_is_started(self):
+        self.details_cache.set("ixvm", mock.MagicMock(), "last details")
+        self.driver.get_inventory(self.context)
+        self.release.set()
+        self._wait_for_job()
+        job = self.job_manager.get("ixvm")
+
+        with mock.patch.object(AutoloadJob, "result_age", new_callable=mock.PropertyMock, return_value=5000):
+            self.assertEqual(self.driver.get_inventory(self.context), "last details")
+
+        self.assertIsNot(self.job_manager.get("ixvm"), job)
+        self._wait_for_job()
+        self.assertEqual(len(self.discover_calls), 2)
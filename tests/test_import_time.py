@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+IMPORT_TIME_BUDGET = 0.15
+IMPORT_RUNS = 5
+
+# packages that must be imported lazily by the command that really needs them
+LAZY_PACKAGES = (
+    "requests",
+    "paramiko",
+    "pysnmp",
+    "cloudshell.api",
+    "cloudshell.snmp",
+    "cloudshell.cli.session.ssh_session",
+    "cloudshell.devices.autoload.autoload_builder",
+    "traffic.ixvm.vchassis.api.client",
+    "traffic.ixvm.vchassis.runners.autoload_runner",
+)
+
+IMPORT_SCRIPT = """
+import json
+import sys
+import time
+import warnings
+
+warnings.simplefilter("ignore")
+start = time.time()
+import driver
+elapsed = time.time() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_import():
+    """Import driver module in a fresh interpreter
+
+    :return: import time in seconds and the names of the loaded modules
+    :rtype: tuple[float, list[str]]
+    """
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT], cwd=SRC_DIR)
+    result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+    return result["elapsed"], result["modules"]
+
+
+class TestDriverImportTime(unittest.TestCase):
+    """Driver cold start budget: the driver module is imported by the execution server for every new driver
+    instance, heavy packages are imported by the commands that really need them"""
+
+    def test_driver_import_fits_the_budget(self):
+        # the best run is compared, so the check isn't affected by the occasional load of the machine
+        best_time = min(measure_import()[0] for _ in xrange(IMPORT_RUNS))
+
+        self.assertLessEqual(best_time, IMPORT_TIME_BUDGET,
+                             "Driver import time {:.3f}s exceeds the budget {:.3f}s".format(best_time,
+                                                                                          IMPORT_TIME_BUDGET))
+
+    def test_heavy_packages_are_not_imported_at_module_level(self):
+        _, modules = measure_import()
+
+        self.assertEqual([name for name in LAZY_PACKAGES if name in modules], [])
@@ -0,0 +1,43 @@
+import json
+import unittest
+
+from traffic.ixvm.vchassis.api.json_stream import iter_json_array
+
+
+def split_chunks(data, size):
+    return [data[index:index + size] for index in xrange(0, len(data), size)]
+
+
+class TestIterJsonArray(unittest.TestCase):
+    def test_items_are_decoded_from_any_chunk_boundaries(self):
+        records = [{"id": 1, "name": u"port \xe9"}, {"id": 22, "nested": [1, 2, {"a": None}]}, 12345, "text",
+                   True, None, -1.5e3, []]
+        data = json.dumps(records, ensure_ascii=False).encode("utf-8")
+
+        for size in xrange(1, len(data) + 1):
+            self.assertEqual(list(iter_json_array(split_chunks(data, size))), records, "chunk size {}".format(size))
+
+    def test_number_split_by_the_chunk_boundary(self):
+        self.assertEqual(list(iter_json_array([b"[12", b"34, 5]"])), [1234, 5])
+        self.assertEqual(list(iter_json_array([b"[1, 2", b"3]"])), [1, 23])
+        self.assertEqual(list(iter_json_array([b"[-1500.", b"25, 1e", b"3]"])), [-1500.25, 1000.0])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([b" [ ", b" ] "])), [])
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"id": 1}']))
+
+    def test_truncated_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b"[1, 2"]))
+
+    def test_malformed_arrays(self):
+        for data in (b"[1 2]", b"[1,,2]", b"[,1]", b"[1,]", b",[1]", b"[1]garbage", b"[1] ]", b"[1]]"):
+            for size in xrange(1, len(data) + 1):
+                with self.assertRaises(ValueError, msg="{} chunk size {}".format(data, size)):
+                    list(iter_json_array(split_chunks(data, size)))
+
+    def test_whitespace_after_array(self):
+        self.assertEqual(list(iter_json_array([b"[1, 2]", b" \r\n"])), [1, 2])
@@ -0,0 +1,80 @@
+import threading
+import unittest
+
+import mock
+
+from traffic.ixvm.vchassis.autoload.pipeline import AutoloadPipeline
+from traffic.ixvm.vchassis.autoload.pipeline import AutoloadProgress
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbeCancelled
+
+
+class TestAutoloadPipeline(unittest.TestCase):
+    def setUp(self):
+        self.progress = AutoloadProgress()
+        self.pipeline = AutoloadPipeline(logger=mock.MagicMock(), progress=self.progress)
+
+    def _wait_for_cancel(self):
+        """Stage that behaves like the readiness probe interrupted by the pipeline cancellation"""
+        if self.pipeline.cancel_event.wait(5):
+            raise ReadinessProbeCancelled("Waiting for the service was cancelled")
+
+    def _get_statuses(self):
+        return {name: phase["status"] for name, phase in self.progress.to_dict().iteritems()}
+
+    def test_run_returns_results_and_passes_them_to_dependencies(self):
+        self.pipeline.add_stage(name="first", func=lambda: 1)
+        self.pipeline.add_stage(name="second",
+                                func=lambda: self.pipeline.get_result("first") + 1,
+                                depends_on=("first",))
+
+        self.assertEqual(self.pipeline.run(), {"first": 1, "second": 2})
+        self.assertEqual(self._get_statuses(), {"first": AutoloadProgress.FINISHED,
+                                                "second": AutoloadProgress.FINISHED})
+
+    def test_run_raises_root_cause_instead_of_cancelled_probe(self):
+        error = ValueError("license server is not reachable")
+
+        def fail():
+            raise error
+
+        self.pipeline.add_stage(name="cli_reachable", func=self._wait_for_cancel)
+        self.pipeline.add_stage(name="license_server", func=fail)
+        self.pipeline.add_stage(name="structure", func=lambda: None, depends_on=("cli_reachable",))
+
+        with self.assertRaises(ValueError) as context:
+            self.pipeline.run()
+
+        self.assertIs(context.exception, error)
+        self.assertEqual(self._get_statuses(), {"cli_reachable": AutoloadProgress.SKIPPED,
+                                                "license_server": AutoloadProgress.FAILED,
+                                                "structure": AutoloadProgress.SKIPPED})
+
+    def test_run_raises_first_failure_in_time_order(self):
+        first_failed = threading.Event()
+
+        def fail_late():
+            first_failed.wait(5)
+            raise ValueError("late")
+
+        def fail_early():
+            try:
+                raise KeyError("early")
+            finally:
+                first_failed.set()
+
+        self.pipeline.add_stage(name="late", func=fail_late)
+        self.pipeline.add_stage(name="early", func=fail_early)
+
+        with self.assertRaises(KeyError):
+            self.pipeline.run()
+
+    def test_cancelled_probe_without_pipeline_cancellation_is_failure(self):
+        def cancelled():
+            raise ReadinessProbeCancelled("cancelled outside of the pipeline")
+
+        self.pipeline.add_stage(name="probe", func=cancelled)
+
+        with self.assertRaises(ReadinessProbeCancelled):
+            self.pipeline.run()
+
+        self.assertEqual(self._get_statuses(), {"probe": AutoloadProgress.FAILED})
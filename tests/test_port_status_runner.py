@@ -0,0 +1,103 @@
+import unittest
+from collections import namedtuple
+
+import mock
+
+from traffic.ixvm.vchassis.runners.port_status_runner import IxVMPortStatusRunner
+from traffic.ixvm.vchassis.runners.port_status_runner import PortStatusCache
+
+
+RESOURCE_NAME = "ixvm"
+PORT_MODEL = "IxVM Virtual Traffic Chassis 2G.VirtualTrafficGeneratorPort"
+MODULE_MODEL = "IxVM Virtual Traffic Chassis 2G.VirtualTrafficGeneratorModule"
+
+Attribute = namedtuple("Attribute", ["Name", "Value"])
+Resource = namedtuple("Resource", ["Name", "FullAddress", "ResourceModelName", "ResourceAttributes",
+                                   "ChildResources"])
+
+
+def create_port(port_number, link_state="linkDown", speed="1000"):
+    return Resource(Name="{}/M1/P{}".format(RESOURCE_NAME, port_number),
+                    FullAddress="192.0.2.10/M1/P{}".format(port_number),
+                    ResourceModelName=PORT_MODEL,
+                    ResourceAttributes=[Attribute(Name="{}.Link State".format(PORT_MODEL), Value=link_state),
+                                        Attribute(Name="{}.Speed".format(PORT_MODEL), Value=speed)],
+                    ChildResources=[])
+
+
+def create_port_data(port_number, link_state="linkDown", speed=1000):
+    return {"id": 1000 + port_number, "parentId": 100, "portNumber": port_number, "linkState": link_state,
+            "speed": speed}
+
+
+class TestIxVMPortStatusRunner(unittest.TestCase):
+    def setUp(self):
+        self.cs_api = mock.MagicMock()
+        self.cs_api.GetResourceDetails.return_value = Resource(
+            Name=RESOURCE_NAME,
+            FullAddress="192.0.2.10",
+            ResourceModelName="IxVM Virtual Traffic Chassis 2G",
+            ResourceAttributes=[],
+            ChildResources=[Resource(Name="{}/M1".format(RESOURCE_NAME),
+                                     FullAddress="192.0.2.10/M1",
+                                     ResourceModelName=MODULE_MODEL,
+                                     ResourceAttributes=[],
+                                     ChildResources=[create_port(1), create_port(2)])])
+        self.api_client = mock.MagicMock()
+        self.api_client.get_cards.return_value = [{"id": 100, "cardNumber": 1}]
+        self.cache = PortStatusCache()
+        self.runner = IxVMPortStatusRunner(api_client=self.api_client,
+                                           cs_api=self.cs_api,
+                                           logger=mock.MagicMock(),
+                                           cache=self.cache)
+
+    def _refresh(self, ports_data):
+        self.api_client.get_ports.return_value = ports_data
+        return self.runner.refresh_port_status(resource_name=RESOURCE_NAME, port_model=PORT_MODEL)
+
+    def test_unchanged_ports_are_not_updated(self):
+        self.assertEqual(self._refresh([create_port_data(1), create_port_data(2)]),
+                         "Updated 0 attribute(s) on 0 port(s)")
+        self.assertEqual(self._refresh([create_port_data(1), create_port_data(2)]),
+                         "Updated 0 attribute(s) on 0 port(s)")
+
+        self.cs_api.SetAttributesValues.assert_not_called()
+        # ports layout is loaded once and reused while the chassis structure doesn't change
+        self.assertEqual(self.cs_api.GetResourceDetails.call_count, 1)
+        self.assertEqual(self.api_client.get_cards.call_count, 1)
+
+    def test_only_changed_attributes_are_updated(self):
+        self.assertEqual(self._refresh([create_port_data(1, link_state="linkUp"), create_port_data(2)]),
+                         "Updated 1 attribute(s) on 1 port(s)")
+
+        (update_requests,), _ = self.cs_api.SetAttributesValues.call_args
+        self.assertEqual([(request.ResourceFullName, [(attribute.Name, attribute.Value)
+                                                      for attribute in request.AttributeNamesValues])
+                          for request in update_requests],
+                         [("ixvm/M1/P1", [("{}.Link State".format(PORT_MODEL), "linkUp")])])
+
+        # updated values are cached, so the same status isn't written again
+        self.assertEqual(self._refresh([create_port_data(1, link_state="linkUp"), create_port_data(2)]),
+                         "Updated 0 attribute(s) on 0 port(s)")
+        self.assertEqual(self.cs_api.SetAttributesValues.call_count, 1)
+
+    def test_removed_ports_are_dropped_from_the_cache(self):
+        self._refresh([create_port_data(1), create_port_data(2)])
+        self._refresh([create_port_data(1)])
+
+        self.assertEqual(sorted(self.cache.get(RESOURCE_NAME).ports), [("1", "1")])
+
+        # port that appears again is reloaded from the resource
+        self._refresh([create_port_data(1), create_port_data(2)])
+
+        self.assertEqual(sorted(self.cache.get(RESOURCE_NAME).ports), [("1", "1"), ("1", "2")])
+        self.assertEqual(self.cs_api.GetResourceDetails.call_count, 2)
+
+    def test_failed_update_invalidates_the_cache(self):
+        self._refresh([create_port_data(1), create_port_data(2)])
+        self.cs_api.SetAttributesValues.side_effect = RuntimeError("CloudShell API error")
+
+        with self.assertRaises(RuntimeError):
+            self._refresh([create_port_data(1, link_state="linkUp"), create_port_data(2)])
+
+        self.assertIsNone(self.cache.get(RESOURCE_NAME))
@@ -0,0 +1,93 @@
+import pstats
+import shutil
+import tempfile
+import threading
+import unittest
+from multiprocessing.pool import ThreadPool
+
+import mock
+
+from traffic.ixvm.vchassis.profiling import CommandProfiler
+
+
+def command_stage():
+    pass
+
+
+def nested_command_stage():
+    pass
+
+
+def other_command_stage():
+    pass
+
+
+def run_in_thread(func):
+    thread = threading.Thread(target=func)
+    thread.start()
+    thread.join(5)
+
+
+class TestCommandProfiler(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.profiler = CommandProfiler(command="get_inventory",
+                                        resource_name="ixvm",
+                                        reservation_id=None,
+                                        logger=mock.MagicMock(),
+                                        enabled=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def _get_profiled_functions(self, profile_path):
+        return {func_name for _, _, func_name in pstats.Stats(profile_path).stats}
+
+    def test_only_threads_started_by_the_command_are_profiled(self):
+        other_command_started = threading.Event()
+        command_finished = threading.Event()
+
+        def other_command():
+            # command running in the same process while the profiled one runs
+            other_command_started.set()
+            command_finished.wait(5)
+            other_command_stage()
+            run_in_thread(other_command_stage)
+
+        other_command_thread = threading.Thread(target=other_command)
+        other_command_thread.start()
+        other_command_started.wait(5)
+
+        with mock.patch("traffic.ixvm.vchassis.profiling.get_log_dir", return_value=self.log_dir):
+            self.profiler.start()
+
+            try:
+                run_in_thread(lambda: run_in_thread(nested_command_stage))
+                pool = ThreadPool(processes=2)
+                pool.map(lambda _: command_stage(), xrange(2))
+                pool.terminate()
+                command_finished.set()
+                other_command_thread.join(5)
+            finally:
+                profile_path = self.profiler.stop()
+
+        functions = self._get_profiled_functions(profile_path)
+        self.assertIn("command_stage", functions)
+        self.assertIn("nested_command_stage", functions)
+        self.assertNotIn("other_command_stage", functions)
+
+    def test_thread_start_is_restored_after_the_profiling(self):
+        thread_start = threading.Thread.start
+
+        with mock.patch("traffic.ixvm.vchassis.profiling.get_log_dir", return_value=self.log_dir):
+            self.profiler.start()
+            self.profiler.stop()
+
+        self.assertEqual(threading.Thread.start, thread_start)
+
+    def test_disabled_profiler_does_nothing(self):
+        profiler = CommandProfiler(command="get_inventory", resource_name="ixvm", reservation_id=None,
+                                   logger=mock.MagicMock(), enabled=False)
+        profiler.start()
+
+        self.assertIsNone(profiler.stop())
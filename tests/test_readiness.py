@@ -0,0 +1,160 @@
+import unittest
+
+import mock
+
+from traffic.ixvm.vchassis.api.client import InventorySnapshot
+from traffic.ixvm.vchassis.api.client import StructureCounts
+from traffic.ixvm.vchassis.probes.readiness import AdaptiveBackoff
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbe
+from traffic.ixvm.vchassis.probes.readiness import ReadinessProbeCancelled
+from traffic.ixvm.vchassis.probes.readiness import wait_for_chassis_structure
+
+
+class FakeCancelEvent(object):
+    def __init__(self, cancel_after=None):
+        """Cancel event that records the waited intervals instead of sleeping
+
+        :param int cancel_after: amount of the waits after which the event is set
+        """
+        self.intervals = []
+        self._cancel_after = cancel_after
+
+    def wait(self, timeout):
+        self.intervals.append(timeout)
+        return self._cancel_after is not None and len(self.intervals) >= self._cancel_after
+
+
+class TestAdaptiveBackoff(unittest.TestCase):
+    def test_intervals_grow_up_to_max_interval(self):
+        backoff = AdaptiveBackoff(min_interval=1, max_interval=10, factor=2, jitter=0)
+
+        self.assertEqual([backoff.next_interval() for _ in xrange(6)], [1, 2, 4, 8, 10, 10])
+
+    def test_reset_starts_from_min_interval(self):
+        backoff = AdaptiveBackoff(min_interval=1, max_interval=10, factor=2, jitter=0)
+        [backoff.next_interval() for _ in xrange(3)]
+
+        backoff.reset()
+
+        self.assertEqual(backoff.next_interval(), 1)
+
+    def test_jitter_keeps_interval_within_bounds(self):
+        backoff = AdaptiveBackoff(min_interval=4, max_interval=4, jitter=0.25)
+
+        for _ in xrange(100):
+            self.assertTrue(3 <= backoff.next_interval() <= 5)
+
+
+@mock.patch("traffic.ixvm.vchassis.probes.readiness.random.uniform", mock.MagicMock(return_value=0))
+class TestReadinessProbe(unittest.TestCase):
+    def _create_probe(self, check, cancel_event, timeout=60):
+        return ReadinessProbe(host="192.0.2.10",
+                              port=443,
+                              check=check,
+                              logger=mock.MagicMock(),
+                              timeout=timeout,
+                              min_interval=1,
+                              max_interval=8,
+                              tcp_poll_interval=0.5,
+                              cancel_event=cancel_event)
+
+    @mock.patch("traffic.ixvm.vchassis.probes.readiness.is_tcp_port_open")
+    def test_closed_port_is_polled_with_fixed_interval(self, is_tcp_port_open):
+        is_tcp_port_open.side_effect = [False] * 6 + [True]
+        cancel_event = FakeCancelEvent()
+
+        self._create_probe(check=lambda: True, cancel_event=cancel_event).wait()
+
+        self.assertEqual(cancel_event.intervals, [0.5] * 6)
+
+    @mock.patch("traffic.ixvm.vchassis.probes.readiness.is_tcp_port_open")
+    def test_service_is_polled_with_backoff_after_port_opens(self, is_tcp_port_open):
+        is_tcp_port_open.side_effect = [False, False, True, True, True, True, True, True]
+        check = mock.MagicMock(side_effect=[False, False, False, False, False, True])
+        cancel_event = FakeCancelEvent()
+
+        self._create_probe(check=check, cancel_event=cancel_event).wait()
+
+        self.assertEqual(cancel_event.intervals, [0.5, 0.5, 1, 2, 4, 8, 8])
+        self.assertEqual(check.call_count, 6)
+
+    @mock.patch("traffic.ixvm.vchassis.probes.readiness.is_tcp_port_open")
+    def test_backoff_is_reset_when_port_opens_again(self, is_tcp_port_open):
+        is_tcp_port_open.side_effect = [True, True, True, False, True, True]
+        check = mock.MagicMock(side_effect=[False, False, False, False, True])
+        cancel_event = FakeCancelEvent()
+
+        self._create_probe(check=check, cancel_event=cancel_event).wait()
+
+        self.assertEqual(cancel_event.intervals, [1, 2, 4, 0.5, 1])
+
+    @mock.patch("traffic.ixvm.vchassis.probes.readiness.is_tcp_port_open", mock.MagicMock(return_value=False))
+    def test_cancelled_wait_raises_error(self):
+        with self.assertRaises(ReadinessProbeCancelled):
+            self._create_probe(check=lambda: True, cancel_event=FakeCancelEvent(cancel_after=3)).wait()
+
+    @mock.patch("traffic.ixvm.vchassis.probes.readiness.is_tcp_port_open", mock.MagicMock(return_value=False))
+    def test_service_not_started_within_timeout_raises_error(self):
+        with self.assertRaisesRegexp(Exception, "didn't start within"):
+            self._create_probe(check=lambda: True, cancel_event=FakeCancelEvent(), timeout=-1).wait()
+
+
+def create_snapshot(cards, ports):
+    return InventorySnapshot(chassis=[{"id": 1}],
+                             cards=[{"id": card_id} for card_id in xrange(cards)],
+                             ports=[{"id": port_id} for port_id in xrange(ports)])
+
+
+class FakeStructureApiClient(object):
+    def __init__(self, counts, snapshots):
+        """API client that returns the given structure counts and inventory snapshots one by one
+
+        :param list[tuple[int, int]] counts: cards and ports counts of the counts probes
+        :param list[tuple[int, int]] snapshots: cards and ports counts of the inventory snapshots
+        """
+        self.calls = []
+        self._counts = iter(counts)
+        self._snapshots = iter(snapshots)
+
+    def get_structure_counts(self):
+        self.calls.append("get_structure_counts")
+        return StructureCounts(*next(self._counts))
+
+    def get_inventory_snapshot(self):
+        self.calls.append("get_inventory_snapshot")
+        return create_snapshot(*next(self._snapshots))
+
+
+class TestWaitForChassisStructure(unittest.TestCase):
+    def _wait(self, api_client, timeout=60):
+        return wait_for_chassis_structure(api_client=api_client,
+                                          logger=mock.MagicMock(),
+                                          timeout=timeout,
+                                          poll_interval=10,
+                                          stability_interval=2,
+                                          cancel_event=FakeCancelEvent())
+
+    def test_stable_structure_is_fetched_once(self):
+        api_client = FakeStructureApiClient(counts=[(0, 0), (2, 8)], snapshots=[(2, 8)])
+
+        snapshot = self._wait(api_client)
+
+        self.assertEqual(snapshot.counts, (2, 8))
+        self.assertEqual(api_client.calls, ["get_structure_counts", "get_structure_counts", "get_inventory_snapshot"])
+
+    def test_structure_changed_during_fetch_is_probed_again(self):
+        api_client = FakeStructureApiClient(counts=[(2, 4), (2, 8)], snapshots=[(2, 6), (2, 8)])
+
+        snapshot = self._wait(api_client)
+
+        self.assertEqual(snapshot.counts, (2, 8))
+        self.assertEqual(api_client.calls, ["get_structure_counts", "get_inventory_snapshot",
+                                            "get_structure_counts", "get_inventory_snapshot"])
+
+    def test_structure_not_appeared_within_timeout_raises_error(self):
+        api_client = FakeStructureApiClient(counts=[(0, 0)], snapshots=[])
+
+        with self.assertRaisesRegexp(Exception, "empty or incomplete"):
+            self._wait(api_client, timeout=-1)
+
+        self.assertEqual(api_client.calls, ["get_structure_counts"])
@@ -0,0 +1,49 @@
+import threading
+import unittest
+
+from traffic.ixvm.vchassis.api.session_cache import ApiKeyCache
+
+
+class TestApiKeyCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ApiKeyCache()
+        self.logins = []
+        self.login_started = threading.Event()
+        self.release = threading.Event()
+
+    def _login(self):
+        self.logins.append(threading.currentThread().name)
+        self.login_started.set()
+        self.release.wait(5)
+        return "api key {}".format(len(self.logins))
+
+    def test_concurrent_logins_are_deduplicated(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get_or_login("192.0.2.10", "admin",
+                                                                                          self._login)))
+                   for _ in xrange(5)]
+
+        for thread in threads:
+            thread.start()
+
+        self.login_started.wait(5)
+        self.release.set()
+
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(self.logins), 1)
+        self.assertEqual(results, ["api key 1"] * 5)
+
+    def test_invalidate_keeps_the_key_received_after_the_rejection(self):
+        self.release.set()
+        rejected_api_key = self.cache.get_or_login("192.0.2.10", "admin", self._login)
+
+        # first thread that got 401 removes the key and logs in again
+        self.cache.invalidate("192.0.2.10", "admin", rejected_api_key)
+        new_api_key = self.cache.get_or_login("192.0.2.10", "admin", self._login)
+        # second thread got 401 for the same key, it reuses the new one
+        self.cache.invalidate("192.0.2.10", "admin", rejected_api_key)
+
+        self.assertEqual(self.cache.get_or_login("192.0.2.10", "admin", self._login), new_api_key)
+        self.assertEqual(len(self.logins), 2)
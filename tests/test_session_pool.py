@@ -0,0 +1,55 @@
+import unittest
+
+import mock
+
+from traffic.ixvm.vchassis.cli import session_pool
+
+
+class FakeSession(object):
+    session_type = "SSH"
+
+    def __init__(self):
+        self.connected = False
+
+    def connect(self, prompt, logger):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+
+class TestResourceSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.MagicMock()
+
+    def tearDown(self):
+        for resource_name in ("first", "second"):
+            session_pool.drop_resource_cli(resource_name, self.logger)
+
+    def _get_pool(self, resource_name, limit=1):
+        session_pool.get_resource_cli(resource_name, limit)
+        _, pool = session_pool._resource_clis[(resource_name, limit)]
+        return pool
+
+    def test_cli_is_shared_by_the_resource_commands(self):
+        self.assertIs(session_pool.get_resource_cli("first", 1), session_pool.get_resource_cli("first", 1))
+        self.assertIsNot(session_pool.get_resource_cli("first", 1), session_pool.get_resource_cli("second", 1))
+
+    def test_sessions_of_other_resources_do_not_count_against_the_limit(self):
+        first_session = self._get_pool("first").get_session(FakeSession(), "#", self.logger)
+        # pool waits for the free session instead of creating it if the limit is reached
+        second_session = self._get_pool("second").get_session(FakeSession(), "#", self.logger)
+
+        self.assertTrue(first_session.connected)
+        self.assertTrue(second_session.connected)
+
+    def test_drop_disconnects_idle_sessions(self):
+        pool = self._get_pool("first")
+        session = pool.get_session(FakeSession(), "#", self.logger)
+        pool.return_session(session, self.logger)
+
+        session_pool.drop_resource_cli("first", self.logger)
+
+        self.assertFalse(session.connected)
+        self.assertNotIn(("first", 1), session_pool._resource_clis)
+        self.assertIsNot(self._get_pool("first"), pool)